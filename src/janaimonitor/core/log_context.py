@@ -0,0 +1,6 @@
+"""
+日志上下文模块 - 保存主程序初始化后的日志配置，供各子模块读取
+"""
+
+# 日志配置信息（如 log_file），由 __main__ 在初始化日志后填充
+config_info = {}
@@ -5,13 +5,13 @@ import os
 import re
 import subprocess
 import time
-import threading
-import queue
 import sys
+from collections import deque
 from pathlib import Path
 from loguru import logger
 from .config import MANGA_COMMAND, ERROR_PATTERNS
 from .file_checker import run_bad_zip_check
+from .log_context import config_info
 
 # 添加日志分类的关键词模式
 LOG_PATTERNS = {
@@ -41,14 +41,79 @@ LOG_PATTERNS = {
     ]
 }
 
+# 预编译：每个分类的模式合并为一个正则
+COMPILED_LOG_PATTERNS = {
+    category: re.compile('|'.join(f'(?:{p})' for p in patterns), re.IGNORECASE)
+    for category, patterns in LOG_PATTERNS.items()
+}
+
+# 错误模式拆分为纯文本关键字和真正的正则：纯文本关键字直接做子串查找，只有剩余模式走正则
+ERROR_LITERALS = tuple((p.lower(), p) for p in ERROR_PATTERNS if re.escape(p) == p)
+_ERROR_REGEX_PATTERNS = [p for p in ERROR_PATTERNS if re.escape(p) != p]
+COMPILED_ERROR_PATTERN = (
+    re.compile('|'.join(f'(?:{p})' for p in _ERROR_REGEX_PATTERNS), re.IGNORECASE)
+    if _ERROR_REGEX_PATTERNS else None
+)
+
 def categorize_log(line):
     """根据关键词将日志分类到不同面板"""
-    for category, patterns in LOG_PATTERNS.items():
-        for pattern in patterns:
-            if re.search(pattern, line, re.IGNORECASE):
-                return category
+    for category, regex in COMPILED_LOG_PATTERNS.items():
+        if regex.search(line):
+            return category
     return '#processing'  # 默认放到处理日志面板
 
+def find_error_pattern(line):
+    """检查一行输出是否包含错误模式
+    
+    Args:
+        line: 子进程输出的一行文本
+        
+    Returns:
+        str: 命中的错误模式，未命中时返回None
+    """
+    lowered = line.lower()
+    for literal, pattern in ERROR_LITERALS:
+        if literal in lowered:
+            return pattern
+    if COMPILED_ERROR_PATTERN is not None:
+        match = COMPILED_ERROR_PATTERN.search(line)
+        if match:
+            return match.group(0)
+    return None
+
+def iter_output_lines(pipe, chunk_size=65536):
+    """按块读取子进程的二进制输出，整块解码后逐行产出文本
+    
+    与文本模式的通用换行一致，\n、\r\n 和单独的 \r（进度条刷新行）都视为行结束。
+    
+    Args:
+        pipe: 子进程的二进制输出管道
+        chunk_size: 单次读取的最大字节数
+        
+    Yields:
+        str: 解码后的一行输出（不含换行符）
+    """
+    fd = pipe.fileno()
+    pending = b''
+    while True:
+        chunk = os.read(fd, chunk_size)
+        if not chunk:
+            break
+        if pending:
+            chunk = pending + chunk
+        last_newline = max(chunk.rfind(b'\n'), chunk.rfind(b'\r'))
+        if last_newline < 0:
+            pending = chunk
+            continue
+        pending = chunk[last_newline + 1:]
+        # 一次解码整块已完整的行，而不是每行单独解码；\r\n 被块边界拆开时只会多出一个空行
+        text = chunk[:last_newline + 1].decode('utf-8', errors='replace')
+        lines = text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+        lines.pop()  # 结尾的行结束符之后是空串
+        yield from lines
+    if pending:
+        yield pending.decode('utf-8', errors='replace')
+
 def restart_manga_converter():
     """重启MangaJaNaiConverter程序，并将输出显示在当前终端"""
     logger.info("重启MangaJaNaiConverter...")
@@ -67,8 +132,15 @@ def restart_manga_converter():
     except Exception as e:
         logger.error(f"重启MangaJaNaiConverter失败: {str(e)}")
 
+# 子进程日志处理器ID，进程生命周期内只注册一次，重启子进程时复用
+_subprocess_sink_id = None
+
 def setup_subprocess_logger(main_log_file):
-    """设置子进程专用的logger"""
+    """设置子进程专用的logger（幂等，已注册时直接返回现有处理器ID）"""
+    global _subprocess_sink_id
+    if _subprocess_sink_id is not None:
+        return _subprocess_sink_id
+    
     # 从主日志文件路径提取目录
     # log_dir = os.path.dirname(main_log_file)
     # # 生成子进程专用日志文件名
@@ -86,55 +158,23 @@ def setup_subprocess_logger(main_log_file):
         filter=lambda record: "subprocess" in record["extra"]
     )
     
+    _subprocess_sink_id = handler_id
     logger.info(f"子进程日志将写入: {main_log_file}")
     return handler_id
 
 def run_manga_with_monitor(force_check=False):
-    """运行MangaJaNaiConverter并实时监控输出错误"""
-    logger.info("启动MangaJaNaiConverter并监控错误...")
-    
-    # 尝试获取主日志文件路径
-    main_log_file = None
-    try:
-        # 从主模块导入配置信息
-        from ..__main__ import config_info
-        if config_info and 'log_file' in config_info:
-            main_log_file = config_info['log_file']
-            logger.info(f"从主模块获取到日志文件路径: {main_log_file}")
-    except (ImportError, AttributeError) as e:
-        logger.warning(f"无法从主模块导入日志配置: {str(e)}")
+    """运行MangaJaNaiConverter并实时监控输出错误，检测到错误或异常退出时在循环内重启"""
+    # 获取主日志文件路径
+    main_log_file = config_info.get('log_file')
+    if main_log_file:
+        logger.info(f"从日志上下文获取到日志文件路径: {main_log_file}")
+    else:
+        logger.warning("日志上下文中没有日志文件路径，子进程日志将不单独写入")
     
-    # 设置子进程专用logger
-    subprocess_handler_id = setup_subprocess_logger(main_log_file) if main_log_file else None
+    # 设置子进程专用logger（只在首次调用时注册，重启时复用）
+    if main_log_file:
+        setup_subprocess_logger(main_log_file)
     
-    process = subprocess.Popen(
-        MANGA_COMMAND,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        stdin=subprocess.DEVNULL,
-        text=True,
-        bufsize=1,
-        universal_newlines=True,
-        encoding='utf-8',
-        errors='replace'
-    )
-    
-    logger.info(f"MangaJaNaiConverter已启动，进程ID: {process.pid}")
-    
-    recent_output = []
-    max_buffer_lines = 20
-    output_queue = queue.Queue()
-
-    def read_output(pipe, queue):
-        for line in iter(pipe.readline, ''):
-            queue.put(line)
-        pipe.close()
-
-    stdout_thread = threading.Thread(target=read_output, args=(process.stdout, output_queue), daemon=True)
-    stderr_thread = threading.Thread(target=read_output, args=(process.stderr, output_queue), daemon=True)
-    stdout_thread.start()
-    stderr_thread.start()
-
     # 尝试导入TextualLoggerManager
     try:
         from textual_logger import TextualLoggerManager
@@ -143,96 +183,105 @@ def run_manga_with_monitor(force_check=False):
         textual_logger_available = False
         logger.warning("无法导入TextualLoggerManager，将使用标准日志记录")
 
-    error_detected = False
-    try:
-        while process.poll() is None or not output_queue.empty():
-            try:
-                line = output_queue.get(block=False)
-                if not line:
-                    continue
-                
-                line = line.strip()
-                
-                # 不再直接打印到终端
-                # print(line, flush=True)
-                
-                # 根据关键词分类日志并记录
-                category = categorize_log(line)
-                
-                # 使用loguru的contextvars记录带分类的子进程日志
-                subprocess_logger = logger.bind(subprocess=True, category=category)
-                subprocess_logger.info(line)
-                
-                # 尝试使用TextualLoggerManager添加到分类面板
-                
-                recent_output.append(line)
-                
-                if len(recent_output) > max_buffer_lines:
-                    recent_output.pop(0)
+    max_buffer_lines = 20
+    
+    while True:
+        logger.info("启动MangaJaNaiConverter并监控错误...")
+        
+        # stderr 合并到 stdout，由当前线程直接按块读取二进制管道，无需读取线程和队列轮询
+        process = subprocess.Popen(
+            MANGA_COMMAND,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            bufsize=0
+        )
+        
+        logger.info(f"MangaJaNaiConverter已启动，进程ID: {process.pid}")
+        
+        recent_output = deque(maxlen=max_buffer_lines)
+        error_detected = False
+        try:
+            for line in iter_output_lines(process.stdout):
+                try:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    
+                    # 不再直接打印到终端
+                    # print(line, flush=True)
+                    
+                    # 根据关键词分类日志并记录
+                    category = categorize_log(line)
                     
-                combined_output = '\n'.join(recent_output)
-                for pattern in ERROR_PATTERNS:
-                    if re.search(pattern, combined_output, re.IGNORECASE):
-                        logger.warning(f"检测到错误模式: {pattern}")
+                    # 使用loguru的contextvars记录带分类的子进程日志
+                    subprocess_logger = logger.bind(subprocess=True, category=category)
+                    subprocess_logger.info(line)
+                    
+                    # 尝试使用TextualLoggerManager添加到分类面板
+                    
+                    recent_output.append(line)
+                    
+                    # 错误模式不依赖跨行上下文，只需检查新到达的这一行
+                    error_pattern = find_error_pattern(line)
+                    if error_pattern:
+                        logger.warning(f"检测到错误模式: {error_pattern}")
+                        logger.debug("错误发生前的输出:\n" + '\n'.join(recent_output))
                         error_detected = True
-                        check_success = run_bad_zip_check(force_check=force_check)
-                        
-                        if check_success:
-                            logger.info("损坏文件检查完成并成功")
-                        else:
-                            logger.warning("损坏文件检查失败或发现问题")
-                        
-                        process.terminate()
-                        try:
-                            process.wait(timeout=5)
-                        except subprocess.TimeoutExpired:
-                            process.kill()
-                        
-                        # 移除子进程logger处理器
-                        if subprocess_handler_id:
-                            logger.remove(subprocess_handler_id)
-                        
-                        # 重启进程
-                        return run_manga_with_monitor(force_check=force_check)
-                        
-                output_queue.task_done()
-            except queue.Empty:
-                pass
-            except Exception as e:
-                logger.error(f"处理输出时发生错误: {str(e)}")
-            time.sleep(0.1)
+                        break
+                except Exception as e:
+                    logger.error(f"处理输出时发生错误: {str(e)}")
+            
+            if error_detected:
+                check_success = run_bad_zip_check(force_check=force_check)
+                
+                if check_success:
+                    logger.info("损坏文件检查完成并成功")
+                else:
+                    logger.warning("损坏文件检查失败或发现问题")
+                
+                process.terminate()
+                try:
+                    process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.wait()
                 
-        if process.returncode != 0 and not error_detected:
-            logger.warning(f"进程异常退出，返回码: {process.returncode}，准备重启...")
-            time.sleep(2)
-            # 移除子进程logger处理器
-            if subprocess_handler_id:
-                logger.remove(subprocess_handler_id)
-            return run_manga_with_monitor(force_check=force_check)
+                # 重启进程
+                continue
             
-    except KeyboardInterrupt:
-        logger.info("用户中断，正在终止进程...")
-        if process.poll() is None:
-            process.terminate()
-            try:
-                process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                process.kill()
-        # 移除子进程logger处理器
-        if subprocess_handler_id:
-            logger.remove(subprocess_handler_id)
-        raise
-    
-    except Exception as e:
-        logger.error(f"监控过程中发生错误: {str(e)}")
-        if process.poll() is None:
-            process.terminate()
-        # 移除子进程logger处理器
-        if subprocess_handler_id:
-            logger.remove(subprocess_handler_id)
-        return False
-    
-    # 移除子进程logger处理器
-    if subprocess_handler_id:
-        logger.remove(subprocess_handler_id)
-    return True
\ No newline at end of file
+            # 输出管道已关闭，等待进程退出
+            process.wait()
+            
+            if process.returncode != 0:
+                logger.warning(f"进程异常退出，返回码: {process.returncode}，准备重启...")
+                time.sleep(2)
+                continue
+            
+        except KeyboardInterrupt:
+            logger.info("用户中断，正在终止进程...")
+            if process.poll() is None:
+                process.terminate()
+                try:
+                    process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.wait()
+            raise
+        
+        except Exception as e:
+            logger.error(f"监控过程中发生错误: {str(e)}")
+            if process.poll() is None:
+                process.terminate()
+                try:
+                    process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.wait()
+            return False
+        
+        finally:
+            # 重启或退出前关闭本轮的输出管道，避免文件描述符泄漏
+            process.stdout.close()
+        
+        return True
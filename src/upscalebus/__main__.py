@@ -3,12 +3,12 @@ import os
 import sys
 import traceback
 from pathlib import Path
-from datetime import datetime
 
 # 从新模块导入功能
 from upscalebus.core.operation import remove_temp_files
 from upscalebus.core.process import process_corrupted_archives, compare_and_copy_archives, process_rename_cbz
 from upscalebus.core.config import config
+from upscalepipe_common.logging_setup import setup_logger
 from loguru import logger
 
 # Rich库导入
@@ -26,66 +26,8 @@ except ImportError:
     print("错误: 未安装Rich库，请运行 pip install rich 安装该库")
     sys.exit(1)
 
-def setup_logger(app_name="app", project_root=None, console_output=True):
-    """配置 Loguru 日志系统
-    
-    Args:
-        app_name: 应用名称，用于日志目录
-        project_root: 项目根目录，默认为当前文件所在目录
-        console_output: 是否输出到控制台，默认为True
-        
-    Returns:
-        tuple: (logger, config_info)
-            - logger: 配置好的 logger 实例
-            - config_info: 包含日志配置信息的字典
-    """
-    # 获取项目根目录
-    if project_root is None:
-        project_root = Path(__file__).parent.resolve()
-    
-    # 清除默认处理器
-    logger.remove()
-    
-    # 有条件地添加控制台处理器（简洁版格式）
-    if console_output:
-        logger.add(
-            sys.stdout,
-            level="INFO",
-            format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <blue>{elapsed}</blue> | <level>{level.icon} {level: <8}</level> | <cyan>{name}:{function}:{line}</cyan> - <level>{message}</level>"
-        )
-    
-    # 使用 datetime 构建日志路径
-    current_time = datetime.now()
-    date_str = current_time.strftime("%Y-%m-%d")
-    hour_str = current_time.strftime("%H")
-    minute_str = current_time.strftime("%M%S")
-    
-    # 构建日志目录和文件路径
-    log_dir = os.path.join(project_root, "logs", app_name, date_str, hour_str)
-    os.makedirs(log_dir, exist_ok=True)
-    log_file = os.path.join(log_dir, f"{minute_str}.log")
-    
-    # 添加文件处理器
-    logger.add(
-        log_file,
-        level="DEBUG",
-        rotation="10 MB",
-        retention="30 days",
-        compression="zip",
-        encoding="utf-8",
-        format="{time:YYYY-MM-DD HH:mm:ss} | {elapsed} | {level.icon} {level: <8} | {name}:{function}:{line} - {message}",
-        enqueue=True,     )
-    
-    # 创建配置信息字典
-    config_info = {
-        'log_file': log_file,
-    }
-    
-    logger.info(f"日志系统已初始化，应用名称: {app_name}")
-    return logger, config_info
-
-
-logger, config_info = setup_logger(app_name="upscale_bus", console_output=True)
+# 日志目录位于本包目录下
+LOG_PROJECT_ROOT = Path(__file__).parent.resolve()
 
 # error_handler 模块似乎未使用，暂时注释掉
 # from .error_handler import handle_file_operation
@@ -125,6 +67,9 @@ TEXTUAL_LAYOUT = {
 
 def main():
     """主执行函数"""
+    # 初始化日志（已在入口处初始化时直接复用）
+    setup_logger(app_name="upscale_bus", project_root=LOG_PROJECT_ROOT, console_output=True)
+    
     # 使用Rich创建更好的UI
     from rich.console import Console
     from rich.panel import Panel
@@ -254,7 +199,7 @@ if __name__ == "__main__":
         console = Console()
         
         # 设置日志配置
-        logger, config_info = setup_logger(app_name="upscale_bus", console_output=True)
+        logger, config_info = setup_logger(app_name="upscale_bus", project_root=LOG_PROJECT_ROOT, console_output=True)
         
         # 添加Rich控制台输出
         console.print(Panel(f"日志文件: [cyan]{config_info['log_file']}[/]", title="日志配置", border_style="blue"))
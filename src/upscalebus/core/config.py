@@ -7,6 +7,12 @@ from pathlib import Path
 from typing import Dict, Any, Optional
 from loguru import logger
 
+# 可选依赖：orjson 可用时用于更快的解析和序列化，否则回退到标准库 json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 class ConfigManager:
     """配置管理类，负责加载、保存和访问配置"""
     def __init__(self, config_path: Optional[str] = None):
@@ -26,8 +32,10 @@ class ConfigManager:
         # 确保配置目录存在
         os.makedirs(os.path.dirname(self.config_path), exist_ok=True)
         
-        # 加载配置
+        # 加载配置，并建立 点号路径 -> 配置值 的扁平索引
         self.config = self._load_config()
+        self._flat: Dict[str, Any] = {}
+        self._rebuild_index()
         
     def _load_config(self) -> Dict[str, Any]:
         """
@@ -42,7 +50,11 @@ class ConfigManager:
                 "size_difference_threshold": 0.5,
                 "ignored_extensions": [".md", ".yaml", ".yml", ".txt", ".json", ".db", ".ini"],
                 "rename_cbz_to_zip": True,
-                "auto_cleanup": True
+                "auto_cleanup": True,
+                "backup_prefer_hardlink": True,
+                "skip_zip_check_when_larger": False,
+                "archive_check_inprocess_zip": True,
+                "archive_check_inprocess_max_mb": 200
             },
             "archive_extensions": [".zip", ".cbz", ".rar", ".7z"],
             "temp_extensions": [".tdel", ".bak"],
@@ -52,14 +64,18 @@ class ConfigManager:
             ],
             "scan": {
                 "max_workers": 4,
-                "skip_checked": True
+                "skip_checked": True,
+                "ignore_dirs": [".git", "node_modules", "__pycache__"],
+                "preview_depth": None,
+                "check_history_ttl_days": None
             },
             "ui": {
                 "table_style": "rounded",
                 "success_color": "green",
                 "error_color": "red",
                 "warning_color": "yellow",
-                "info_color": "blue"
+                "info_color": "blue",
+                "verbose_ops": True
             },
             "auto_operations": {
                 "check_corrupted": True,
@@ -73,8 +89,12 @@ class ConfigManager:
         # 检查配置文件是否存在
         if os.path.exists(self.config_path):
             try:
-                with open(self.config_path, 'r', encoding='utf-8') as f:
-                    loaded_config = json.load(f)
+                if orjson is not None:
+                    with open(self.config_path, 'rb') as f:
+                        loaded_config = orjson.loads(f.read())
+                else:
+                    with open(self.config_path, 'r', encoding='utf-8') as f:
+                        loaded_config = json.load(f)
                 
                 # 更新默认配置（这样可以确保新版本添加的配置项也存在）
                 self._update_nested_dict(default_config, loaded_config)
@@ -117,8 +137,12 @@ class ConfigManager:
             config = self.config
             
         try:
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                json.dump(config, f, ensure_ascii=False, indent=2)
+            if orjson is not None:
+                with open(self.config_path, 'wb') as f:
+                    f.write(orjson.dumps(config, option=orjson.OPT_INDENT_2))
+            else:
+                with open(self.config_path, 'w', encoding='utf-8') as f:
+                    json.dump(config, f, ensure_ascii=False, indent=2)
             logger.info(f"已保存配置文件: {self.config_path}")
             return True
         except Exception as e:
@@ -136,16 +160,20 @@ class ConfigManager:
         Returns:
             Any: 配置值或默认值
         """
-        keys = key_path.split('.')
-        value = self.config
-        
-        for key in keys:
-            if isinstance(value, dict) and key in value:
-                value = value[key]
-            else:
-                return default
-        
-        return value
+        return self._flat.get(key_path, default)
+    
+    def _rebuild_index(self) -> None:
+        """根据当前配置重建扁平索引，中间层级的字典路径同样可以查询"""
+        flat = {}
+        pending = [('', self.config)]
+        while pending:
+            prefix, node = pending.pop()
+            for key, value in node.items():
+                path = f"{prefix}{key}"
+                flat[path] = value
+                if isinstance(value, dict):
+                    pending.append((path + '.', value))
+        self._flat = flat
     
     def set_value(self, key_path: str, value: Any) -> bool:
         """
@@ -169,6 +197,7 @@ class ConfigManager:
         
         # 设置值
         config[keys[-1]] = value
+        self._rebuild_index()
         return True
     
     def save(self) -> bool:
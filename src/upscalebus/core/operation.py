@@ -2,8 +2,12 @@
 文件操作模块 - 提供文件和目录操作的基础功能
 """
 import os
+import re
 import shutil
 import time
+import functools
+import struct
+import concurrent.futures
 import zipfile
 from datetime import datetime
 from pathlib import Path
@@ -13,13 +17,100 @@ from loguru import logger
 
 from .config import config
 
+# Windows 上使用系统 CopyFileW 复制文件（内核侧完成复制并保留属性和时间戳），
+# 其它平台的 shutil.copy2 已经使用 sendfile 等零拷贝方式
+_CopyFileW = None
+if os.name == 'nt':
+    try:
+        import ctypes
+        from ctypes import wintypes
+        _kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        _CopyFileW = _kernel32.CopyFileW
+        _CopyFileW.argtypes = (wintypes.LPCWSTR, wintypes.LPCWSTR, wintypes.BOOL)
+        _CopyFileW.restype = wintypes.BOOL
+    except (ImportError, AttributeError, OSError):
+        _CopyFileW = None
+
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
+@functools.lru_cache(maxsize=4096)
 def format_size(size_in_bytes):
     """将字节大小转换为人类可读的格式"""
-    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-        if size_in_bytes < 1024.0:
-            return f"{size_in_bytes:.2f} {unit}"
-        size_in_bytes /= 1024.0
-    return f"{size_in_bytes:.2f} PB"
+    if size_in_bytes < 1024:
+        return f"{size_in_bytes:.2f} B"
+    # 由整数位长度直接得到单位档位（每档 2^10），只做一次除法
+    unit_index = min((int(size_in_bytes).bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+    return f"{size_in_bytes / (1 << (unit_index * 10)):.2f} {_SIZE_UNITS[unit_index]}"
+
+def _walk_files(directory):
+    """
+    基于 os.scandir 遍历目录树，逐个目录产出其中的文件条目和子目录名
+    
+    与 os.walk(followlinks=False) 行为一致：不进入符号链接目录，无法读取的目录直接跳过。
+    DirEntry 复用目录读取时返回的类型信息，不再为每个条目单独 stat。
+    名称在 scan.ignore_dirs 中的目录整体跳过。
+    
+    Args:
+        directory: 要遍历的目录
+        
+    Yields:
+        tuple: (目录路径, 该目录下文件的 DirEntry 列表, 该目录下所有子目录名的列表)
+    """
+    ignore_dirs = _IGNORE_DIRS
+    pending = [directory]
+    while pending:
+        root = pending.pop()
+        files = []
+        dir_names = []
+        try:
+            with os.scandir(root) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir():
+                            dir_names.append(entry.name)
+                            if not entry.is_symlink() and entry.name not in ignore_dirs:
+                                pending.append(entry.path)
+                        else:
+                            files.append(entry)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+        yield root, files, dir_names
+
+def _iter_dirs_bottom_up(directory):
+    """
+    基于 os.scandir 自底向上产出目录树中的所有子目录（不含根目录本身）
+    
+    子目录总是先于其父目录产出，因此删除空目录后父目录可以在随后被判定为空。
+    不进入符号链接目录，名称在 scan.ignore_dirs 中的目录既不产出也不进入。
+    
+    Args:
+        directory: 要遍历的目录
+        
+    Yields:
+        str: 子目录路径
+    """
+    ignore_dirs = _IGNORE_DIRS
+    # (目录路径, 子目录是否已入栈)
+    pending = [(directory, False)]
+    while pending:
+        dir_path, expanded = pending.pop()
+        if expanded:
+            if dir_path != directory:
+                yield dir_path
+            continue
+        pending.append((dir_path, True))
+        try:
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False) and entry.name not in ignore_dirs:
+                            pending.append((entry.path, False))
+                    except OSError:
+                        continue
+        except OSError:
+            continue
 
 def remove_empty_directories(directory):
     """
@@ -32,18 +123,39 @@ def remove_empty_directories(directory):
         int: 删除的空文件夹数量
     """
     removed_count = 0
-    for root, dirs, _ in os.walk(directory, topdown=False):
-        for dir_name in dirs:
-            dir_path = os.path.join(root, dir_name)
-            try:
-                if not os.listdir(dir_path):  # 检查文件夹是否为空
-                    os.rmdir(dir_path)
-                    removed_count += 1
-                    logger.info(f"[#processing]已删除空文件夹: {dir_path}")
-            except Exception as e:
-                logger.info(f"[#processing]删除空文件夹失败 {dir_path}: {e}")
+    for dir_path in _iter_dirs_bottom_up(directory):
+        try:
+            # 只读取第一个条目即可判断文件夹是否为空，无需列出全部内容
+            with os.scandir(dir_path) as it:
+                empty = next(it, None) is None
+            if empty:
+                os.rmdir(dir_path)
+                removed_count += 1
+                if _VERBOSE:
+                    logger.info("[#processing]已删除空文件夹: {}", dir_path)
+        except Exception as e:
+            logger.info("[#processing]删除空文件夹失败 {}: {}", dir_path, e)
     return removed_count
 
+def _remove_file(file_path):
+    """
+    删除单个临时文件
+    
+    Args:
+        file_path: 文件路径
+        
+    Returns:
+        int: 删除成功返回1，否则返回0
+    """
+    try:
+        os.remove(file_path)
+        if _VERBOSE:
+            logger.info("[#processing]已删除临时文件: {}", file_path)
+        return 1
+    except Exception as e:
+        logger.info("[#processing]删除临时文件失败 {}: {}", file_path, e)
+        return 0
+
 def remove_temp_files(directory):
     """
     删除指定目录下的所有临时文件（根据配置的扩展名）
@@ -57,22 +169,103 @@ def remove_temp_files(directory):
     # 从配置获取临时文件扩展名
     temp_extensions = tuple(config.get_value('file_operations.temp_extensions', ['.tdel', '.bak']))
     
-    removed_count = 0
-    for root, _, files in os.walk(directory):
-        for file in files:
-            if file.endswith(temp_extensions):
-                file_path = os.path.join(root, file)
-                try:
-                    os.remove(file_path)
-                    removed_count += 1
-                    logger.info(f"[#processing]已删除临时文件: {file_path}")
-                except Exception as e:
-                    logger.info(f"[#processing]删除临时文件失败 {file_path}: {e}")
-    return removed_count
+    # 先收集待删除文件，再交给线程池并发删除
+    temp_files = [
+        entry.path
+        for _, files, _ in _walk_files(directory)
+        for entry in files
+        if entry.name.endswith(temp_extensions)
+    ]
+    if not temp_files:
+        return 0
+    
+    max_workers = config.get_value('scan.max_workers', 4)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return sum(executor.map(_remove_file, temp_files))
 
-def count_files_in_zip(zip_path):
+# zip 结构常量：EOCD（中央目录结束记录）最短 22 字节，注释最长 65535 字节
+_EOCD_SIGNATURE = b'PK\x05\x06'
+_ZIP64_LOCATOR_SIGNATURE = b'PK\x06\x07'
+_EOCD_MIN_SIZE = 22
+_EOCD_SEARCH_SIZE = _EOCD_MIN_SIZE + 0xFFFF
+_CDH_SIGNATURE = 0x02014b50
+_CDH_SIZE = 46
+_CDH_STRUCT = struct.Struct('<I4xH14xIHHH')  # 签名, 标志位, 原始大小, 文件名/扩展/注释长度
+_EOCD_STRUCT = struct.Struct('<4x2xH2xHII')  # 本盘之前的盘号, 总条目数, 中央目录大小/偏移
+
+def _scan_central_directory(zip_path):
     """
-    统计zip文件中的文件数量和总大小，忽略特定类型的文件
+    直接解析zip中央目录，统计文件数量和总大小，不构造 ZipFile/ZipInfo 对象
+    
+    只处理常见的单卷、非 ZIP64 格式；遇到其它情况返回None，由调用方回退到 zipfile。
+    
+    Args:
+        zip_path: zip文件路径
+        
+    Returns:
+        tuple: (文件数量, 内容总大小)，无法解析时返回None
+    """
+    ignored_match = _IGNORED_EXT_RE.search
+    
+    with open(zip_path, 'rb') as f:
+        file_size = f.seek(0, os.SEEK_END)
+        tail_size = min(file_size, _EOCD_SEARCH_SIZE)
+        f.seek(file_size - tail_size)
+        tail = f.read(tail_size)
+        
+        eocd_pos = tail.rfind(_EOCD_SIGNATURE)
+        if eocd_pos < 0 or len(tail) - eocd_pos < _EOCD_MIN_SIZE:
+            return None
+        if eocd_pos >= 20 and tail[eocd_pos - 20:eocd_pos - 16] == _ZIP64_LOCATOR_SIGNATURE:
+            return None
+        disk_no, entry_count, cd_size, cd_offset = _EOCD_STRUCT.unpack_from(tail, eocd_pos)
+        if disk_no != 0 or entry_count == 0xFFFF or cd_size == 0xFFFFFFFF or cd_offset == 0xFFFFFFFF:
+            return None
+        
+        # 以 EOCD 位置倒推中央目录起点，兼容 zip 前附加了其它数据的情况
+        cd_start = file_size - tail_size + eocd_pos - cd_size
+        if cd_start < 0:
+            return None
+        tail_start = file_size - tail_size
+        if cd_start >= tail_start:
+            data = tail[cd_start - tail_start:eocd_pos]
+        else:
+            f.seek(cd_start)
+            data = f.read(cd_size)
+    
+    if len(data) != cd_size:
+        return None
+    
+    file_count = 0
+    total_size = 0
+    entries = 0
+    pos = 0
+    unpack_header = _CDH_STRUCT.unpack_from
+    while pos + _CDH_SIZE <= cd_size:
+        signature, flags, entry_size, name_len, extra_len, comment_len = unpack_header(data, pos)
+        if signature != _CDH_SIGNATURE or entry_size == 0xFFFFFFFF:
+            return None
+        name_start = pos + _CDH_SIZE
+        pos = name_start + name_len + extra_len + comment_len
+        entries += 1
+        if entry_size == 0:
+            continue
+        # 与 zipfile 一致：设置了 UTF-8 标志位时按 UTF-8 解码，否则按 cp437
+        name = data[name_start:name_start + name_len].decode(
+            'utf-8' if flags & 0x800 else 'cp437', errors='replace')
+        if not name.endswith('/') and not ignored_match(name):
+            file_count += 1
+            total_size += entry_size
+    
+    if entries != entry_count or pos != cd_size:
+        return None
+    return file_count, total_size
+
+def _count_files_in_zip_uncached(zip_path):
+    """
+    读取zip中央目录，统计文件数量和总大小（不使用缓存）
+    
+    优先直接解析中央目录，无法处理的格式（ZIP64、分卷等）回退到 zipfile。
     
     Args:
         zip_path: zip文件路径
@@ -80,23 +273,87 @@ def count_files_in_zip(zip_path):
     Returns:
         tuple: (文件数量, 内容总大小)
     """
-    # 从配置获取忽略的扩展名
-    ignore_extensions = tuple(config.get_value('file_operations.ignored_extensions', 
-                                              ['.md', '.yaml', '.yml', '.txt', '.json', '.db', '.ini']))
+    try:
+        result = _scan_central_directory(zip_path)
+        if result is not None:
+            return result
+    except (OSError, struct.error):
+        pass
+    
+    ignored_match = _IGNORED_EXT_RE.search
     
     try:
         with zipfile.ZipFile(zip_path) as zip_file:
-            valid_files = [name for name in zip_file.namelist() 
-                          if not name.lower().endswith(ignore_extensions)
-                          and not name.endswith('/')
-                          and zip_file.getinfo(name).file_size > 0]
-            
-            total_size = sum(zip_file.getinfo(name).file_size for name in valid_files)
-            return len(valid_files), total_size
+            # 单次遍历 ZipInfo 同时统计数量和大小，无需再按文件名反查
+            file_count = 0
+            total_size = 0
+            for info in zip_file.infolist():
+                name = info.filename
+                if (info.file_size > 0
+                        and not name.endswith('/')
+                        and not ignored_match(name)):
+                    file_count += 1
+                    total_size += info.file_size
+            return file_count, total_size
     except Exception as e:
         logger.info(f"[#processing]读取zip文件失败 {zip_path}: {str(e)}")
         return 0, 0
 
+@functools.lru_cache(maxsize=4096)
+def _zip_stats(zip_path, mtime_ns, size):
+    """按 (路径, 修改时间, 大小) 缓存zip统计结果，文件变化后键随之变化"""
+    return _count_files_in_zip_uncached(zip_path)
+
+def count_files_in_zip(zip_path):
+    """
+    统计zip文件中的文件数量和总大小，忽略特定类型的文件
+    
+    同一文件未修改时直接返回缓存结果，不再重复解析中央目录。
+    
+    Args:
+        zip_path: zip文件路径
+        
+    Returns:
+        tuple: (文件数量, 内容总大小)
+    """
+    try:
+        st = os.stat(zip_path)
+    except OSError as e:
+        logger.info(f"[#processing]读取zip文件失败 {zip_path}: {str(e)}")
+        return 0, 0
+    return _zip_stats(zip_path, st.st_mtime_ns, st.st_size)
+
+count_files_in_zip.cache_clear = _zip_stats.cache_clear
+
+def _compile_suffix_pattern(extensions):
+    """将扩展名列表编译为一个忽略大小写的后缀匹配正则"""
+    if not extensions:
+        return re.compile(r'(?!)')  # 空列表时永不匹配
+    return re.compile('(?:' + '|'.join(re.escape(ext) for ext in extensions) + r')\Z', re.IGNORECASE)
+
+_IGNORED_EXT_RE = None
+_ARCHIVE_EXT_RE = None
+_IGNORE_DIRS = frozenset()
+_VERBOSE = True
+
+def refresh_config():
+    """
+    根据当前配置重建模块级的扩展名匹配器，并清空依赖这些配置的缓存
+    
+    修改 ignored_extensions、archive_extensions、scan.ignore_dirs 或 ui.verbose_ops 配置后需要调用。
+    """
+    global _IGNORED_EXT_RE, _ARCHIVE_EXT_RE, _IGNORE_DIRS, _VERBOSE
+    _IGNORED_EXT_RE = _compile_suffix_pattern(config.get_value(
+        'file_operations.ignored_extensions', ['.md', '.yaml', '.yml', '.txt', '.json', '.db', '.ini']))
+    _ARCHIVE_EXT_RE = _compile_suffix_pattern(config.get_value(
+        'archive_extensions', ['.zip', '.cbz', '.rar', '.7z']))
+    _IGNORE_DIRS = frozenset(config.get_value('scan.ignore_dirs', ['.git', 'node_modules', '__pycache__']))
+    # 关闭后逐文件的成功日志不再输出，失败日志不受影响
+    _VERBOSE = config.get_value('ui.verbose_ops', True)
+    _zip_stats.cache_clear()
+
+refresh_config()
+
 def is_safe_to_overwrite(source_path, target_path):
     """
     检查是否可以安全地覆盖目标文件
@@ -115,20 +372,24 @@ def is_safe_to_overwrite(source_path, target_path):
     min_size = config.get_value('file_operations.min_valid_file_size', 1024 * 1024)  # 默认1MB
     size_threshold = config.get_value('file_operations.size_difference_threshold', 0.5)  # 默认50%
     file_count_threshold = config.get_value('file_operations.file_count_difference_threshold', 0.0)  # 默认0%，即要求完全相等
+    skip_zip_check_when_larger = config.get_value('file_operations.skip_zip_check_when_larger', False)
     
-    if not os.path.exists(source_path):
+    # 每个文件只 stat 一次，同时得到存在性、大小，以及压缩包统计缓存所需的修改时间
+    try:
+        source_stat = os.stat(source_path)
+    except OSError:
         return False, "源文件不存在", None, None
+    source_size = source_stat.st_size
     
-    if not os.path.exists(target_path):
+    try:
+        target_stat = os.stat(target_path)
+    except OSError:
         # 目标文件不存在，直接复制
-        source_size = os.path.getsize(source_path)
         if source_size < min_size:
             return False, f"源文件过小 ({format_size(source_size)})", {"size": source_size}, None
         return True, "目标文件不存在，可以安全复制", {"size": source_size}, None
     
-    source_size = os.path.getsize(source_path)
-    target_size = os.path.getsize(target_path)
-    
+    target_size = target_stat.st_size
     source_info = {"size": source_size}
     target_info = {"size": target_size}
     
@@ -138,14 +399,12 @@ def is_safe_to_overwrite(source_path, target_path):
       # 源文件明显小于目标文件
     if source_size < target_size * size_threshold:
         return False, f"源文件({format_size(source_size)})明显小于目标文件({format_size(target_size)})", source_info, target_info
-      # 从配置获取压缩包扩展名
-    archive_extensions = tuple(config.get_value('archive_extensions', 
-                                               ['.zip', '.cbz', '.rar', '.7z']))
     
     # 如果是压缩包，比较内部文件数量
-    if any(source_path.lower().endswith(ext) for ext in archive_extensions):
-        source_files, source_content_size = count_files_in_zip(source_path)
-        target_files, target_content_size = count_files_in_zip(target_path)
+    if _ARCHIVE_EXT_RE.search(source_path):
+        # 复用上面的 stat 结果查询缓存，不再由 count_files_in_zip 重复 stat
+        source_files, source_content_size = _zip_stats(source_path, source_stat.st_mtime_ns, source_size)
+        target_files, target_content_size = _zip_stats(target_path, target_stat.st_mtime_ns, target_size)
         
         source_info["files"] = source_files
         source_info["content_size"] = source_content_size
@@ -153,18 +412,79 @@ def is_safe_to_overwrite(source_path, target_path):
         target_info["content_size"] = target_content_size
         if source_files < target_files * (1.0 - file_count_threshold):
             return False, f"源压缩包内文件数量({source_files})明显少于目标压缩包({target_files})", source_info, target_info
+        # 文件数量检查始终执行（放大后的源文件通常更大，但仍可能缺页）；
+        # 开启 skip_zip_check_when_larger 时，源文件不小于目标文件只跳过内容大小比较
+        if skip_zip_check_when_larger and source_size >= target_size:
+            return True, "文件检查通过，可以安全覆盖", source_info, target_info
         if source_content_size < target_content_size * size_threshold:
             return False, f"源压缩包内容大小({format_size(source_content_size)})明显小于目标压缩包({format_size(target_content_size)})", source_info, target_info
     
     return True, "文件检查通过，可以安全覆盖", source_info, target_info
 
-def backup_file(file_path, backup_dir=None):
+def _try_hardlink(source_path, link_path):
+    """
+    尝试为文件创建硬链接
+    
+    Returns:
+        bool: 成功返回True；跨卷、文件系统不支持等情况返回False
+    """
+    try:
+        os.link(source_path, link_path)
+        return True
+    except OSError:
+        return False
+
+def _copy_file_native(source_path, target_path):
+    """
+    复制文件内容及元数据，Windows 上调用 CopyFileW，其它平台使用 shutil.copy2
+    
+    Args:
+        source_path: 源文件路径
+        target_path: 目标文件路径
+        
+    Returns:
+        str: 目标文件路径
+    """
+    if _CopyFileW is not None:
+        if not _CopyFileW(os.fspath(source_path), os.fspath(target_path), False):
+            raise ctypes.WinError(ctypes.get_last_error())
+        return target_path
+    return shutil.copy2(source_path, target_path)
+
+def copy_file_atomic(source_path, target_path):
+    """
+    复制文件到目标路径：先写入同目录的临时文件，再用 os.replace 替换目标
+    
+    目标文件是被替换而不是被原地截断改写，因此与其共享inode的硬链接备份不受影响，
+    复制中途失败时目标文件也保持原样。可作为 shutil.move 的 copy_function 使用。
+    
+    Args:
+        source_path: 源文件路径
+        target_path: 目标文件路径
+        
+    Returns:
+        str: 目标文件路径
+    """
+    temp_path = target_path + '.uptmp'
+    try:
+        _copy_file_native(source_path, temp_path)
+        os.replace(temp_path, target_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    return target_path
+
+def backup_file(file_path, backup_dir=None, timestamp=None):
     """
     创建文件备份
     
     Args:
         file_path: 要备份的文件路径
         backup_dir: 备份目录，如果为None，则在同一目录下创建备份
+        timestamp: 备份文件名中的时间戳，如果为None则使用当前时间；批量备份时可由调用方统一计算后传入
         
     Returns:
         str: 备份文件的路径
@@ -173,11 +493,8 @@ def backup_file(file_path, backup_dir=None):
         # 尝试从配置获取备份目录
         backup_dir = config.get_value('directories.backup_dir')
     
-    if not os.path.exists(file_path):
-        logger.warning(f"要备份的文件不存在: {file_path}")
-        return None
-    
-    timestamp = time.strftime("%Y%m%d_%H%M%S")
+    if timestamp is None:
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
     file_name = os.path.basename(file_path)
     backup_name = f"{file_name}.{timestamp}.upbak"
     
@@ -187,14 +504,69 @@ def backup_file(file_path, backup_dir=None):
     else:
         backup_path = os.path.join(os.path.dirname(file_path), backup_name)
     
+    # 同一卷上优先使用硬链接，无需复制数据；不可用时回退为完整复制
+    prefer_hardlink = config.get_value('file_operations.backup_prefer_hardlink', True)
+    
     try:
-        shutil.copy2(file_path, backup_path)
-        logger.info(f"[#processing]已创建文件备份: {backup_path}")
+        if not (prefer_hardlink and _try_hardlink(file_path, backup_path)):
+            shutil.copy2(file_path, backup_path)
+        if _VERBOSE:
+            logger.info("[#processing]已创建文件备份: {}", backup_path)
         return backup_path
+    except FileNotFoundError:
+        logger.warning(f"要备份的文件不存在: {file_path}")
+        return None
     except Exception as e:
         logger.error(f"创建文件备份失败: {str(e)}")
         return None
 
+def _rename_no_clobber(source_path, target_path):
+    """
+    重命名文件，目标已存在时抛出 FileExistsError 而不是覆盖
+    
+    收集阶段之后目标仍可能被其他程序创建（例如正在写出的放大结果），因此重命名本身也不能覆盖。
+    
+    Args:
+        source_path: 源路径
+        target_path: 目标路径
+    """
+    if os.name == 'nt':
+        # Windows 上目标已存在时 os.rename 会报错
+        os.rename(source_path, target_path)
+        return
+    try:
+        # POSIX 上 os.rename 会静默覆盖，改用硬链接：目标已存在时 link 失败
+        os.link(source_path, target_path)
+    except FileExistsError:
+        raise
+    except OSError:
+        # 文件系统不支持硬链接时退回到先检查再重命名
+        if os.path.lexists(target_path):
+            raise FileExistsError(target_path)
+        os.rename(source_path, target_path)
+        return
+    os.unlink(source_path)
+
+def _rename_file(paths):
+    """
+    重命名单个文件
+    
+    Args:
+        paths: (源路径, 目标路径)
+        
+    Returns:
+        int: 重命名成功返回1，否则返回0
+    """
+    source_path, target_path = paths
+    try:
+        _rename_no_clobber(source_path, target_path)
+        if _VERBOSE:
+            logger.info("[#processing]已重命名: {} -> {}", source_path, target_path)
+        return 1
+    except Exception as e:
+        logger.info("[#processing]重命名失败 {}: {}", source_path, e)
+        return 0
+
 def rename_cbz_to_zip(directory):
     """
     将指定目录下的所有.cbz文件重命名为.zip文件
@@ -205,23 +577,34 @@ def rename_cbz_to_zip(directory):
     Returns:
         int: 重命名的文件数量
     """
-    renamed_count = 0
-    for root, _, files in os.walk(directory):
-        for file in files:
-            if file.lower().endswith('.cbz'):
-                source_path = os.path.join(root, file)
-                target_path = os.path.join(root, file[:-4] + '.zip')
+    # 先收集重命名任务，再交给线程池并发执行
+    rename_pairs = []
+    for root, files, dir_names in _walk_files(directory):
+        # 用同一次 scandir 得到的文件名和子目录名判断目标是否已存在（包括本次已计划的目标），
+        # 不再为每个文件单独 stat；normcase 使 Windows 下按不区分大小写比较
+        taken_names = {os.path.normcase(entry.name) for entry in files}
+        taken_names.update(os.path.normcase(name) for name in dir_names)
+        for entry in files:
+            file = entry.name
+            # 只对末尾 4 个字符做大小写转换，避免为整个文件名分配新字符串
+            if file[-4:].lower() == '.cbz':
+                source_path = entry.path
+                target_name = file[:-4] + '.zip'
+                target_key = os.path.normcase(target_name)
                 
-                # 检查目标文件是否已存在
-                if os.path.exists(target_path):
-                    logger.info(f"[#processing]目标文件已存在，跳过重命名: {source_path}")
+                if target_key in taken_names:
+                    logger.info("[#processing]目标文件已存在，跳过重命名: {}", source_path)
                     continue
-                    
-                try:
-                    os.rename(source_path, target_path)
-                    renamed_count += 1
-                    logger.info(f"[#processing]已重命名: {source_path} -> {target_path}")
-                except Exception as e:
-                    logger.info(f"[#processing]重命名失败 {source_path}: {e}")
-    
-    return renamed_count
+                
+                taken_names.add(target_key)
+                rename_pairs.append((source_path, os.path.join(root, target_name)))
+    
+    # 按路径排序，使同一目录下的重命名连续执行
+    rename_pairs.sort()
+    
+    if not rename_pairs:
+        return 0
+    
+    max_workers = config.get_value('scan.max_workers', 4)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return sum(executor.map(_rename_file, rename_pairs))
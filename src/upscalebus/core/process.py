@@ -3,6 +3,8 @@
 """
 import os
 import shutil
+import time
+import itertools
 import send2trash
 import concurrent.futures
 from typing import Dict, List, Tuple, Optional, Any
@@ -14,34 +16,39 @@ from .config import config
 from .operation import (
     remove_empty_directories, 
     remove_temp_files, 
-    is_safe_to_overwrite, 
     backup_file,
+    copy_file_atomic,
     format_size
 )
 from .scan import (
     scan_directory_structure, 
+    scan_directory_summary,
     check_archive, 
     load_check_history, 
     save_check_history,
+    is_check_cached_valid,
+    CheckHistoryWriter,
     ArchiveOperation
 )
 from .ui import (
     console, 
     display_directory_tree, 
     generate_operations_preview, 
-    select_subdirectory
+    select_subdirectory,
+    ProgressReporter
 )
 from rich.panel import Panel
 from rich.prompt import Confirm
 
-def prepare_operations(source_structure: Dict, target_structure: Dict, 
-                       source_base: str, target_base: str, is_move: bool) -> List[ArchiveOperation]:
+def prepare_operations(source_structure: Dict, source_base: str, target_base: str, 
+                       is_move: bool) -> List[ArchiveOperation]:
     """
     准备文件操作列表
     
+    目标路径只由源文件相对 source_base 的路径拼接到 target_base 得到，不需要目标目录的扫描结果。
+    
     Args:
         source_structure: 源目录结构
-        target_structure: 目标目录结构
         source_base: 源基础路径
         target_base: 目标基础路径
         is_move: 是否为移动操作
@@ -50,42 +57,36 @@ def prepare_operations(source_structure: Dict, target_structure: Dict,
         list: ArchiveOperation对象列表
     """
     operations = []
+    operation_type = "move" if is_move else "copy"
     
-    # 处理当前目录中的文件
-    for file_info in source_structure["files"]:
-        if file_info["is_archive"]:
-            rel_path = os.path.relpath(os.path.dirname(file_info["path"]), source_base)
+    # 用显式栈按深度优先顺序遍历（与递归版本的输出顺序一致），所有操作追加到同一个列表
+    pending = [source_structure]
+    while pending:
+        structure = pending.pop()
+        
+        # 当前目录下所有文件共用同一个目标目录，每层只计算一次；
+        # 扫描得到的路径都以 source_base 为前缀，直接切片即可得到相对路径
+        dir_path = structure["path"]
+        if dir_path.startswith(source_base):
+            rel_path = dir_path[len(source_base):].lstrip('\\/')
+        else:
+            rel_path = os.path.relpath(dir_path, source_base)
             if rel_path == ".":
                 rel_path = ""
-            
-            target_dir = os.path.join(target_base, rel_path)
-            target_path = os.path.join(target_dir, file_info["name"])
-            
-            operation = ArchiveOperation(
-                file_info["path"], 
-                target_path,
-                "move" if is_move else "copy"
-            )
-            operations.append(operation)
-    
-    # 递归处理子目录
-    for subdir in source_structure["subdirs"]:
-        # 找到目标中对应的子目录
-        target_subdir = next(
-            (d for d in target_structure["subdirs"] if d["name"] == subdir["name"]), 
-            {"path": os.path.join(target_structure["path"], subdir["name"]), "subdirs": [], "files": []}
-        )
+        target_dir = os.path.join(target_base, rel_path)
         
-        # 递归处理
-        subdir_operations = prepare_operations(
-            subdir, 
-            target_subdir, 
-            source_base, 
-            target_base,
-            is_move
-        )
+        # 处理当前目录中的文件
+        for file_info in structure["files"]:
+            if file_info["is_archive"]:
+                operation = ArchiveOperation(
+                    file_info["path"], 
+                    os.path.join(target_dir, file_info["name"]),
+                    operation_type
+                )
+                operations.append(operation)
         
-        operations.extend(subdir_operations)
+        # 子目录逆序入栈，保证按原顺序处理
+        pending.extend(reversed(structure["subdirs"]))
     
     return operations
 
@@ -122,41 +123,52 @@ def filter_operations(operations: List[ArchiveOperation],
     
     return filtered
 
-def scan_directory_pair(source_dir: str, target_dir: str) -> Tuple[Dict, Dict]:
+def _execute_operation(operation, backup_dir, backup_timestamp):
     """
-    扫描源目录和目标目录结构
+    执行单个复制/移动操作，目标已存在时先备份，失败时尝试从备份恢复
     
     Args:
-        source_dir: 源目录
-        target_dir: 目标目录
+        operation: ArchiveOperation 实例，执行结果写回其 status/error_message/backup_path
+        backup_dir: 备份目录，为None时备份到目标文件所在目录
+        backup_timestamp: 备份文件名中使用的时间戳
         
     Returns:
-        tuple: (源目录结构, 目标目录结构)
+        ArchiveOperation: 传入的操作对象
     """
-    console.print(f"[bold blue]正在扫描源目录：[/][yellow]{source_dir}[/]")
-    with Progress() as progress:
-        task = progress.add_task("扫描中...", total=None)
-        source_structure = scan_directory_structure(source_dir)
-        progress.update(task, completed=100)
-    
-    console.print(f"[bold blue]正在扫描目标目录：[/][yellow]{target_dir}[/]")
-    with Progress() as progress:
-        task = progress.add_task("扫描中...", total=None)
-        if os.path.exists(target_dir):
-            target_structure = scan_directory_structure(target_dir)
+    try:
+        # 如果目标已存在，先备份
+        if os.path.exists(operation.target_path):
+            operation.backup_path = backup_file(operation.target_path, backup_dir, timestamp=backup_timestamp)
+        
+        target_dir = os.path.dirname(operation.target_path)
+        os.makedirs(target_dir, exist_ok=True)
+        
+        # 目标通过替换写入，不会改写可能以硬链接方式存在的备份
+        if operation.operation_type == "move":
+            # 同一文件系统内直接重命名（单次元数据操作，并原子替换已存在的目标）；
+            # 跨设备等情况失败后再交给 shutil.move 复制后删除
+            try:
+                os.replace(operation.source_path, operation.target_path)
+            except OSError:
+                shutil.move(operation.source_path, operation.target_path, copy_function=copy_file_atomic)
         else:
-            target_structure = {
-                "path": target_dir,
-                "name": os.path.basename(target_dir) or target_dir,
-                "type": "directory",
-                "subdirs": [],
-                "files": [],
-                "archive_count": 0,
-                "total_size": 0
-            }
-        progress.update(task, completed=100)
+            copy_file_atomic(operation.source_path, operation.target_path)
+        
+        operation.status = "success"
+    except Exception as e:
+        operation.status = "error"
+        operation.error_message = str(e)
+        logger.error(f"执行文件操作失败: {operation.source_path} -> {operation.target_path}, 错误: {str(e)}")
+        
+        # 如果有备份，尝试恢复
+        if operation.backup_path and os.path.exists(operation.backup_path):
+            try:
+                copy_file_atomic(operation.backup_path, operation.target_path)
+                logger.info(f"已从备份恢复文件: {operation.target_path}")
+            except Exception as restore_error:
+                logger.error(f"恢复备份失败: {str(restore_error)}")
     
-    return source_structure, target_structure
+    return operation
 
 def compare_and_copy_archives(source_dir: str, target_dir: str, is_move: bool = False):
     """
@@ -170,51 +182,46 @@ def compare_and_copy_archives(source_dir: str, target_dir: str, is_move: bool =
     console.print(Panel(f"[bold]开始处理目录对[/]\n\n源目录: [green]{source_dir}[/]\n目标目录: [yellow]{target_dir}[/]", 
                        title="文件处理任务", border_style="blue"))
     
-    # 扫描目录结构
-    source_structure, target_structure = scan_directory_pair(source_dir, target_dir)
+    # 扫描源目录结构；目标路径由相对路径直接拼接，目标文件在安全性分析时逐个 stat，无需预先扫描目标目录
+    # 配置了 scan.preview_depth 时，先按深度限制扫描用于预览和选择，选定后只完整扫描选中的目录
+    preview_depth = config.get_value('scan.preview_depth', None)
+    console.print(f"[bold blue]正在扫描源目录：[/][yellow]{source_dir}[/]")
+    with Progress() as progress:
+        task = progress.add_task("扫描中...", total=None)
+        if preview_depth is None:
+            source_structure = scan_directory_structure(source_dir)
+        else:
+            source_structure = scan_directory_structure(source_dir, include_files=False, max_depth=preview_depth)
+        progress.update(task, completed=100)
     
     # 显示目录统计
     console.print(f"\n[bold]源目录统计：[/]")
-    console.print(f"总压缩包数: [green]{source_structure['archive_count']}[/]")
+    archive_count = source_structure['archive_count']
+    console.print(f"总压缩包数: [green]{archive_count}{'+' if source_structure['truncated'] else ''}[/]")
     console.print(f"总大小: [green]{format_size(source_structure['total_size'])}[/]")
     
     # 让用户选择要处理的子目录
     selected_source = select_subdirectory(source_structure, "请选择要处理的源子目录")
     
-    # 根据选择构建对应的目标结构
-    if selected_source is source_structure:
-        selected_target = target_structure
+    # 完整扫描会替换 selected_source，先记录是否选中了整个源目录
+    is_root_selected = selected_source is source_structure
+    
+    # 根据选择计算对应的目标目录
+    if is_root_selected:
+        selected_target_path = target_dir
     else:
-        # 查找相匹配的目标子目录，或创建新结构
         rel_path = os.path.relpath(selected_source["path"], source_structure["path"])
-        target_path = os.path.normpath(os.path.join(target_structure["path"], rel_path))
-        
-        if os.path.exists(target_path):
-            for subdir in target_structure["subdirs"]:
-                if os.path.normpath(subdir["path"]) == target_path:
-                    selected_target = subdir
-                    break
-            else:
-                # 目录存在但不在结构中，重新扫描
-                selected_target = scan_directory_structure(target_path)
-        else:
-            # 目标子目录不存在，创建空结构
-            selected_target = {
-                "path": target_path,
-                "name": os.path.basename(target_path),
-                "type": "directory",
-                "subdirs": [],
-                "files": [],
-                "archive_count": 0,
-                "total_size": 0
-            }
+        selected_target_path = os.path.normpath(os.path.join(target_dir, rel_path))
+    
+    if preview_depth is not None:
+        console.print(f"[bold blue]正在完整扫描选中的目录：[/][yellow]{selected_source['path']}[/]")
+        selected_source = scan_directory_structure(selected_source["path"])
     
     # 准备操作列表
     operations = prepare_operations(
         selected_source, 
-        selected_target, 
         selected_source["path"], 
-        target_structure["path"] if selected_source is source_structure else selected_target["path"],
+        selected_target_path,
         is_move
     )
     
@@ -223,18 +230,19 @@ def compare_and_copy_archives(source_dir: str, target_dir: str, is_move: bool =
         return
     
     # 分析操作安全性
+    # 分析以 stat 和读取压缩包目录为主，使用线程池并发执行
+    analyze_workers = max(1, config.get_value('processing.analyze_workers', min(32, (os.cpu_count() or 1) * 4)))
+    
     with Progress() as progress:
         task = progress.add_task("分析文件安全性...", total=len(operations))
         
-        def analyze_operation(op):
-            op.is_safe, op.reason, op.source_info, op.target_info = is_safe_to_overwrite(
-                op.source_path, op.target_path
-            )
-            return op
-            
-        for op in operations:
-            analyze_operation(op)
-            progress.update(task, advance=1)
+        # 进度由后台线程定期同步，逐项只累加计数
+        with concurrent.futures.ThreadPoolExecutor(max_workers=analyze_workers) as executor, \
+                ProgressReporter(progress, task) as reporter:
+            futures = [executor.submit(op.analyze) for op in operations]
+            for future in concurrent.futures.as_completed(futures):
+                future.result()
+                reporter.advance()
     
     # 计算安全和不安全操作数量
     safe_ops = [op for op in operations if op.is_safe]
@@ -265,49 +273,38 @@ def compare_and_copy_archives(source_dir: str, target_dir: str, is_move: bool =
     skip_count = 0
     error_count = 0
     
+    # 备份目录和时间戳整批只取一次，序号保证同名目标的备份互不覆盖
+    backup_dir = config.get_value('directories.backup_dir')
+    batch_timestamp = time.strftime("%Y%m%d_%H%M%S")
+    
+    # 各文件操作互不依赖，交给线程池并发执行（复制以 I/O 等待为主）
+    copy_workers = max(1, config.get_value('processing.copy_workers', 8))
+    
+    total = len(operations)
+    
+    def describe(done, operation):
+        op_type = "移动" if operation.operation_type == "move" else "复制"
+        return f"已{op_type} {done}/{total}: {os.path.basename(operation.source_path)}"
+    
     with Progress() as progress:
-        task = progress.add_task("执行文件操作...", total=len(operations))
+        task = progress.add_task("执行文件操作...", total=total)
         
-        for i, operation in enumerate(operations, 1):
-            op_type = "移动" if operation.operation_type == "move" else "复制"
-            progress.update(task, description=f"正在{op_type} {i}/{len(operations)}: {os.path.basename(operation.source_path)}")
-            
-            # 执行操作
-            try:
-                # 如果目标已存在，先备份
-                if os.path.exists(operation.target_path):
-                    backup_dir = config.get_value('directories.backup_dir')
-                    operation.backup_path = backup_file(operation.target_path, backup_dir)
-                
-                target_dir = os.path.dirname(operation.target_path)
-                os.makedirs(target_dir, exist_ok=True)
-                
-                if operation.operation_type == "move":
-                    shutil.move(operation.source_path, operation.target_path)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=copy_workers) as executor, \
+                ProgressReporter(progress, task, describe=describe) as reporter:
+            futures = [
+                executor.submit(_execute_operation, operation, backup_dir, f"{batch_timestamp}_{i:04d}")
+                for i, operation in enumerate(operations, 1)
+            ]
+            for future in concurrent.futures.as_completed(futures):
+                operation = future.result()
+                reporter.advance(operation)
+                if operation.status == "success":
+                    success_count += 1
                 else:
-                    shutil.copy2(operation.source_path, operation.target_path)
-                
-                operation.status = "success"
-                success_count += 1
-            except Exception as e:
-                operation.status = "error"
-                operation.error_message = str(e)
-                logger.error(f"执行文件操作失败: {operation.source_path} -> {operation.target_path}, 错误: {str(e)}")
-                
-                # 如果有备份，尝试恢复
-                if operation.backup_path and os.path.exists(operation.backup_path):
-                    try:
-                        shutil.copy2(operation.backup_path, operation.target_path)
-                        logger.info(f"已从备份恢复文件: {operation.target_path}")
-                    except Exception as restore_error:
-                        logger.error(f"恢复备份失败: {str(restore_error)}")
-                
-                error_count += 1
-            
-            progress.update(task, advance=1)
+                    error_count += 1
     
     # 如果是移动操作且配置允许，删除空文件夹
-    if is_move and selected_source is source_structure and config.get_value('processing.auto_remove_empty_dirs', True):
+    if is_move and is_root_selected and config.get_value('processing.auto_remove_empty_dirs', True):
         console.print("\n[bold]清理空文件夹...[/]")
         removed_count = remove_empty_directories(source_dir)
         console.print(f"已删除 [green]{removed_count}[/] 个空文件夹")
@@ -325,6 +322,43 @@ def compare_and_copy_archives(source_dir: str, target_dir: str, is_move: bool =
     logger.info(f"[#stats]跳过处理: {skip_count} 个文件")
     logger.info(f"[#stats]错误处理: {error_count} 个文件")
 
+def _check_single_archive(file_path):
+    """
+    检测单个压缩包，返回可序列化的结果字典（定义在模块级以便进程池调用）
+    
+    Args:
+        file_path: 压缩包文件路径
+        
+    Returns:
+        dict: 检测结果
+    """
+    # 记录检测时文件的大小和修改时间，文件变化后历史记录自动失效
+    try:
+        st = os.stat(file_path)
+        size, mtime_ns = st.st_size, st.st_mtime_ns
+    except OSError:
+        size = mtime_ns = None
+    try:
+        is_valid = check_archive(file_path, file_size=size)
+        return {
+            'path': file_path,
+            'valid': is_valid,
+            'size': size,
+            'mtime_ns': mtime_ns,
+            'timestamp': None,  # 会在save_check_history中添加
+            'error': None
+        }
+    except Exception as e:
+        logger.error(f"[#updating]检测过程中发生异常: {str(e)}")
+        return {
+            'path': file_path,
+            'valid': False,
+            'size': size,
+            'mtime_ns': mtime_ns,
+            'timestamp': None,  # 会在save_check_history中添加
+            'error': str(e)
+        }
+
 def process_corrupted_archives(directory, skip_checked=True):
     """
     检测并处理指定目录下的损坏压缩包
@@ -339,8 +373,8 @@ def process_corrupted_archives(directory, skip_checked=True):
     console.print(Panel(f"[bold]开始检测目录中的损坏压缩包[/]\n\n目录: [green]{directory}[/]", 
                        title="压缩包检测", border_style="blue"))
     
-    # 扫描目录结构
-    dir_structure = scan_directory_structure(directory)
+    # 扫描目录结构，跳过 temp_ 开头的文件夹
+    dir_structure = scan_directory_structure(directory, exclude_prefixes=('temp_',))
     
     # 显示目录统计
     console.print(f"\n[bold]目录统计：[/]")
@@ -350,46 +384,35 @@ def process_corrupted_archives(directory, skip_checked=True):
     # 让用户选择要处理的子目录
     # selected_dir = select_subdirectory(dir_structure, "请选择要检测的子目录")
     selected_dir = dir_structure
-    # 从配置获取压缩包扩展名
-    archive_extensions = tuple(config.get_value('file_operations.archive_extensions', 
-                                              ['.zip', '.cbz', '.rar', '.7z']))
     
     # 加载历史记录
     history_file = os.path.join(directory, 'archive_check_history.json')
     check_history = load_check_history(history_file)
     
-    # 删除 temp_ 开头的文件夹
-    for root, dirs, _ in os.walk(selected_dir["path"], topdown=True):
-        dirs[:] = [d for d in dirs if not d.startswith('temp_')]
-    
     # 收集要处理的文件
     console.print("\n[bold]正在扫描需要检测的文件...[/]")
     
-    files_to_process = []
-    
-    def collect_files_from_structure(structure):
-        result = []
-        for file_info in structure["files"]:
-            if file_info["name"].lower().endswith(archive_extensions) and not file_info["path"].endswith('.tdel'):
-                # 检查历史记录
-                if skip_checked and file_info["path"] in check_history and check_history[file_info["path"]].get('valid') is True:
-                    continue
-                result.append(file_info["path"])
-        
-        for subdir in structure["subdirs"]:
-            result.extend(collect_files_from_structure(subdir))
-        
-        return result
-    
-    files_to_process = collect_files_from_structure(selected_dir)
-    
-    total = len(files_to_process)
+    def iter_files_from_structure(structure):
+        """按目录结构逐个产出需要检测的文件路径，不构建完整列表"""
+        pending = [structure]
+        while pending:
+            node = pending.pop()
+            for file_info in node["files"]:
+                # is_archive 在扫描时已按相同的扩展名配置计算
+                if file_info["is_archive"] and not file_info["path"].endswith('.tdel'):
+                    # 检查历史记录（已检测为完好且之后未修改的文件跳过）
+                    if skip_checked and is_check_cached_valid(check_history, file_info["path"]):
+                        continue
+                    yield file_info["path"]
+            pending.extend(reversed(node["subdirs"]))
     
-    if total == 0:
+    # 待检测文件由生成器边遍历边提交，不预先构建完整列表；这里只用扫描得到的压缩包总数提示
+    archive_total = selected_dir["archive_count"]
+    if archive_total == 0:
         console.print("[yellow]没有需要检测的文件。[/]")
         return
     
-    console.print(f"[green]找到 {total} 个需要检测的压缩包文件。[/]")
+    console.print(f"[green]找到 {archive_total} 个压缩包文件（历史记录中已确认完好的将跳过）。[/]")
     
     # 预览并询问是否继续
     if not Confirm.ask("\n是否继续检测这些文件？", default=True):
@@ -400,55 +423,72 @@ def process_corrupted_archives(directory, skip_checked=True):
     processed = 0
     valid_count = 0
     invalid_count = 0
+    cancelled_count = 0
     
-    def process_single_file(file_path):
-        """处理单个文件"""
-        try:
-            is_valid = check_archive(file_path)
-            return {
-                'path': file_path,
-                'valid': is_valid,
-                'timestamp': None,  # 会在save_check_history中添加
-                'error': None
-            }
-        except Exception as e:
-            logger.error(f"[#updating]检测过程中发生异常: {str(e)}")
-            return {
-                'path': file_path,
-                'valid': False,
-                'timestamp': None,  # 会在save_check_history中添加
-                'error': str(e)
-                        }
-
-    with Progress() as progress:
-        task = progress.add_task("检测压缩包...", total=total)
+    # 检测记录在整个检测过程中共用一个文件句柄，批量写入
+    with Progress() as progress, CheckHistoryWriter(history_file) as history_writer:
+        # 总数在生成器遍历完毕后才确定
+        task = progress.add_task("检测压缩包...", total=None)
+        
+        # 停滞判定窗口取单个文件动态超时的上限，再留30秒余量，避免大文件的正常检测被误判为卡死
+        single_file_timeout = max(
+            config.get_value('file_operations.archive_check_min_timeout', 60),
+            config.get_value('file_operations.archive_check_max_timeout', 1800)
+        ) + 30
         
-        # 从配置获取超时设置
-        single_file_timeout = config.get_value('file_operations.archive_check_timeout', 300) + 30  # 为单个文件处理留30秒余量
+        # 7z 检测在子进程中运行，zip/cbz 的进程内校验大部分时间在释放 GIL 的 zlib 中，默认用线程池即可；
+        # 开启 processing.check_use_processes 后改用进程池，zipfile 的逐成员循环也能跨 CPU 并行，
+        # 此时工作进程数不超过 CPU 核数，避免同时打开过多文件和进程
+        if config.get_value('processing.check_use_processes', False):
+            executor_class = concurrent.futures.ProcessPoolExecutor
+            max_workers = max(1, min(max_workers, os.cpu_count() or 1))
+        else:
+            executor_class = concurrent.futures.ThreadPoolExecutor
         
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {executor.submit(process_single_file, file_path): file_path for file_path in files_to_process}
+        executor = executor_class(max_workers=max_workers)
+        stalled = False
+        try:
+            # 边检测边提交：同时在途的任务数量有上限，每完成一个再补充一个
+            file_iter = iter_files_from_structure(selected_dir)
+            futures = {}
+            submitted = 0
+            exhausted = False
             
-            try:
-                for future in concurrent.futures.as_completed(futures, timeout=single_file_timeout):
-                    file_path = futures[future]
+            def submit_next(count):
+                nonlocal submitted, exhausted
+                if exhausted:
+                    return
+                added = 0
+                for file_path in itertools.islice(file_iter, count):
+                    futures[executor.submit(_check_single_archive, file_path)] = file_path
+                    added += 1
+                submitted += added
+                if added < count:
+                    exhausted = True
+                    progress.update(task, total=submitted)
+            
+            submit_next(max_workers * 4)
+            
+            while futures:
+                done, _ = concurrent.futures.wait(
+                    futures, timeout=single_file_timeout, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                if not done:
+                    logger.error(f"[#updating]检测任务超过 {single_file_timeout} 秒没有进展，正在取消剩余任务...")
+                    # 取消所有尚未开始的任务，剩余文件不再提交；被取消的文件未检测，不计为损坏
+                    stalled = True
+                    for future, file_path in futures.items():
+                        if future.cancel():
+                            logger.warning(f"[#updating]已取消未开始的任务: {os.path.basename(file_path)}")
+                            cancelled_count += 1
+                    cancelled_count += sum(1 for _ in file_iter)
+                    break
+                
+                for future in done:
+                    file_path = futures.pop(future)
+                    processed += 1
                     try:
-                        # 为每个future设置超时
-                        result = future.result(timeout=single_file_timeout)
-                    except concurrent.futures.TimeoutError:
-                        logger.error(f"[#updating]文件检测任务超时: {os.path.basename(file_path)}")
-                        invalid_count += 1
-                        
-                        # 保存超时记录
-                        save_check_history(history_file, {
-                            'path': file_path,
-                            'valid': False,
-                            'error': 'Timeout'
-                        })
-                        
-                        processed += 1
-                        progress.update(task, completed=processed)
-                        continue
+                        result = future.result()
                     except Exception as e:
                         logger.error(f"[#updating]任务执行失败: {os.path.basename(file_path)}: {str(e)}")
                         invalid_count += 1
@@ -458,9 +498,8 @@ def process_corrupted_archives(directory, skip_checked=True):
                             'path': file_path,
                             'valid': False,
                             'error': str(e)
-                        })
+                        }, writer=history_writer)
                         
-                        processed += 1
                         progress.update(task, completed=processed)
                         continue
                     
@@ -469,14 +508,18 @@ def process_corrupted_archives(directory, skip_checked=True):
                     # 更新历史记录
                     check_history[file_path] = {
                         'timestamp': None,  # 会在save_check_history中添加
-                        'valid': is_valid
+                        'valid': is_valid,
+                        'size': result['size'],
+                        'mtime_ns': result['mtime_ns']
                     }
                     
                     # 保存记录
                     save_check_history(history_file, {
                         'path': file_path,
                         'valid': is_valid,
-                    })
+                        'size': result['size'],
+                        'mtime_ns': result['mtime_ns'],
+                    }, writer=history_writer)
                     
                     # 处理无效文件
                     if is_valid:
@@ -497,39 +540,23 @@ def process_corrupted_archives(directory, skip_checked=True):
                                 console.print(f"[green]已将文件标记为: {os.path.basename(new_path)}[/]")
                             except Exception as e:
                                 logger.error(f"[#updating]重命名文件失败: {str(e)}")
-                            processed += 1
                     progress.update(task, completed=processed)
-                    
-            except concurrent.futures.TimeoutError:
-                logger.error(f"[#updating]整体检测任务超时，正在取消剩余任务...")
-                # 取消所有未完成的任务
-                for future in futures:
-                    if not future.done():
-                        future.cancel()
-                        file_path = futures[future]
-                        logger.warning(f"[#updating]已取消超时任务: {os.path.basename(file_path)}")
-                        invalid_count += 1
-                        processed += 1
-                        progress.update(task, completed=processed)
-                    
-                    if Confirm.ask(f"是否将文件标记为 .tdel?", default=True):
-                        try:
-                            if os.path.exists(new_path):
-                                os.remove(new_path)
-                                logger.info(f"[#processing]删除已存在的tdel文件: {os.path.basename(new_path)}")
-                            os.rename(file_path, new_path)
-                            console.print(f"[green]已将文件标记为: {os.path.basename(new_path)}[/]")
-                        except Exception as e:
-                            logger.error(f"[#updating]重命名文件失败: {str(e)}")
                 
-                processed += 1
-                progress.update(task, completed=processed)
+                submit_next(len(done))
+        finally:
+            # 停滞时不再等待卡住的任务，直接返回
+            executor.shutdown(wait=not stalled, cancel_futures=True)
+    
+    if processed == 0 and cancelled_count == 0:
+        console.print("[yellow]没有需要检测的文件（均已在历史记录中确认完好）。[/]")
+        return
     
     # 显示结果
     console.print(Panel(
         f"检测完成: [green]{processed}[/] 个文件\n"
         f"完好文件: [green]{valid_count}[/] 个\n"
-        f"损坏文件: [red]{invalid_count}[/] 个",
+        f"损坏文件: [red]{invalid_count}[/] 个\n"
+        f"未检测（已取消）: [yellow]{cancelled_count}[/] 个",
         title="检测完成", 
         border_style="green"
     ))
@@ -546,8 +573,8 @@ def process_rename_cbz(directory):
     console.print(Panel(f"[bold]开始处理目录中的CBZ文件[/]\n\n目录: [green]{directory}[/]", 
                        title="CBZ重命名", border_style="blue"))
     
-    # 扫描目录结构
-    dir_structure = scan_directory_structure(directory)
+    # 扫描目录结构（这里只需要统计信息，不保留文件列表）
+    dir_structure = scan_directory_summary(directory)
     
     # 显示目录统计
     console.print(f"\n[bold]目录统计：[/]")
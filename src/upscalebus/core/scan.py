@@ -4,115 +4,315 @@
 import os
 import subprocess
 import json
-from datetime import datetime
+import threading
+import zipfile
+from dataclasses import dataclass
+from datetime import datetime, timedelta
 import concurrent.futures
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, List, Tuple, Optional, Any, Iterator
 
 from loguru import logger
 
+# 可选依赖：orjson 可用时用于更快地解析检测历史，否则回退到标准库 json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from .config import config
-from .operation import format_size
+from .operation import format_size, is_safe_to_overwrite
 
-def scan_directory_structure(root_dir: str) -> Dict:
+def _new_directory_node(dir_path: str) -> Dict:
     """
-    扫描目录结构，返回层次化的目录信息
+    创建一个空的目录节点
     
     Args:
-        root_dir: 要扫描的根目录
+        dir_path: 目录路径
         
     Returns:
-        dict: 包含目录结构和文件信息的嵌套字典
+        dict: 目录节点
     """
-    # 从配置获取压缩包扩展名
-    archive_extensions = tuple(config.get_value('file_operations.archive_extensions', 
-                                               ['.zip', '.cbz', '.rar', '.7z']))
-    
-    result = {
-        "path": root_dir,
-        "name": os.path.basename(root_dir) or root_dir,
+    return {
+        "path": dir_path,
+        "name": os.path.basename(dir_path) or dir_path,
         "type": "directory",
         "subdirs": [],
         "files": [],
+        "file_count": 0,
         "archive_count": 0,
-        "total_size": 0
+        "total_size": 0,
+        "truncated": False
     }
+
+def _scan_single_directory(node: Dict, archive_extensions: frozenset, include_files: bool = True) -> List[str]:
+    """
+    读取单个目录（不递归），填充节点的文件列表及本层的统计信息
     
-    try:
-        items = os.listdir(root_dir)
-        
-        dirs = []
-        files = []
-        
-        for item in items:
-            full_path = os.path.join(root_dir, item)
-            
-            if os.path.isdir(full_path):
-                dirs.append(item)
-            else:
-                file_size = os.path.getsize(full_path)
-                file_info = {
-                    "name": item,
-                    "path": full_path,
-                    "size": file_size,
-                    "is_archive": any(item.lower().endswith(ext) for ext in archive_extensions)
-                }
-                files.append(file_info)
-                result["total_size"] += file_size
-                if file_info["is_archive"]:
-                    result["archive_count"] += 1
-        
-        # 处理子目录
-        for dir_name in dirs:
-            subdir_path = os.path.join(root_dir, dir_name)
-            subdir_info = scan_directory_structure(subdir_path)
-            result["subdirs"].append(subdir_info)
-            result["archive_count"] += subdir_info["archive_count"]
-            result["total_size"] += subdir_info["total_size"]
-        
-        # 添加文件信息
-        result["files"] = files
+    Args:
+        node: 要填充的目录节点
+        archive_extensions: 小写的压缩包扩展名集合
+        include_files: 是否保留文件列表，为False时只统计数量和大小
         
+    Returns:
+        list: 子目录路径列表
+    """
+    root_dir = node["path"]
+    dirs = []
+    files = []
+    
+    try:
+        # scandir 的 DirEntry 自带类型信息，Windows 上还缓存了 stat 结果，避免逐项 isdir/getsize
+        with os.scandir(root_dir) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        dirs.append(entry.path)
+                    elif entry.is_file():
+                        item = entry.name
+                        file_size = entry.stat().st_size
+                        # 只对扩展名部分做小写转换，再用集合判断
+                        dot = item.rfind('.')
+                        is_archive = dot >= 0 and item[dot:].lower() in archive_extensions
+                        if include_files:
+                            files.append({
+                                "name": item,
+                                "path": entry.path,
+                                "size": file_size,
+                                "is_archive": is_archive
+                            })
+                        node["file_count"] += 1
+                        node["total_size"] += file_size
+                        if is_archive:
+                            node["archive_count"] += 1
+                except OSError as e:
+                    logger.warning(f"扫描条目 {entry.path} 时出错: {str(e)}")
     except Exception as e:
         logger.error(f"扫描目录 {root_dir} 时出错: {str(e)}")
     
+    node["files"] = files
+    return dirs
+
+def scan_directory_structure(root_dir: str, exclude_prefixes: Tuple[str, ...] = (),
+                             include_files: bool = True, max_depth: Optional[int] = None) -> Dict:
+    """
+    扫描目录结构，返回层次化的目录信息
+    
+    按层广度优先遍历，同一层的目录交给线程池并发读取（目录读取以 I/O 等待为主），
+    不受递归深度限制；遍历结束后再自底向上汇总各目录的统计信息。
+    
+    Args:
+        root_dir: 要扫描的根目录
+        exclude_prefixes: 要跳过的子目录名前缀，名称以其开头的子目录及其内容都不计入结果
+        include_files: 是否在节点中保留每个文件的信息，只需要统计结果时传False以节省内存
+        max_depth: 最大展开深度（根目录为0），超出深度的子目录不再读取，
+            其上层节点标记为 truncated，统计结果只包含已读取的部分；None表示不限制
+        
+    Returns:
+        dict: 包含目录结构和文件信息的嵌套字典，各节点的 subdirs 按名称排序
+    """
+    exclude_prefixes = tuple(exclude_prefixes)
+    # 从配置获取压缩包扩展名
+    archive_extensions = frozenset(ext.lower() for ext in config.get_value('file_operations.archive_extensions', 
+                                                                           ['.zip', '.cbz', '.rar', '.7z']))
+    max_workers = max(1, config.get_value('processing.scan_workers', 8))
+    
+    result = _new_directory_node(root_dir)
+    
+    def scan_node(node):
+        return _scan_single_directory(node, archive_extensions, include_files)
+    
+    # visited 按层记录 (节点, 父节点)，子节点总是排在父节点之后
+    visited = [(result, None)]
+    level = [result]
+    depth = 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while level:
+            expand = max_depth is None or depth < max_depth
+            next_level = []
+            for node, subdir_paths in zip(level, executor.map(scan_node, level)):
+                subdir_paths = [
+                    path for path in subdir_paths
+                    if not (exclude_prefixes and os.path.basename(path).startswith(exclude_prefixes))
+                ]
+                if not expand:
+                    # 达到深度限制，只记录本层文件，子目录不再展开
+                    node["truncated"] = bool(subdir_paths)
+                    continue
+                # 同一目录下的子目录路径前缀相同，按路径排序即按名称排序，之后的显示和选择不再重复排序
+                subdir_paths.sort()
+                subdir_nodes = [_new_directory_node(path) for path in subdir_paths]
+                node["subdirs"] = subdir_nodes
+                next_level.extend(subdir_nodes)
+                visited.extend((child, node) for child in subdir_nodes)
+            level = next_level
+            depth += 1
+    
+    # 逆序遍历即为自底向上，把每个目录的汇总结果累加到父目录
+    for node, parent in reversed(visited):
+        if parent is not None:
+            parent["archive_count"] += node["archive_count"]
+            parent["total_size"] += node["total_size"]
+            if node["truncated"]:
+                parent["truncated"] = True
+    
     return result
 
-def check_archive(file_path, timeout=None):
+def scan_directory_summary(root_dir: str, exclude_prefixes: Tuple[str, ...] = ()) -> Dict:
+    """
+    扫描目录结构，只保留各目录的汇总信息（文件数、压缩包数、总大小），不保存文件列表
+    
+    Args:
+        root_dir: 要扫描的根目录
+        exclude_prefixes: 要跳过的子目录名前缀
+        
+    Returns:
+        dict: 与scan_directory_structure结构相同的嵌套字典，其中files均为空列表
+    """
+    return scan_directory_structure(root_dir, exclude_prefixes, include_files=False)
+
+def iter_archive_files(root_dir: str, exclude_prefixes: Tuple[str, ...] = ()) -> Iterator[Tuple[str, int]]:
+    """
+    流式遍历目录下的所有压缩包，不构建完整的目录结构
+    
+    Args:
+        root_dir: 要遍历的根目录
+        exclude_prefixes: 要跳过的子目录名前缀
+        
+    Yields:
+        tuple: (压缩包路径, 文件大小)
+    """
+    exclude_prefixes = tuple(exclude_prefixes)
+    archive_extensions = frozenset(ext.lower() for ext in config.get_value('file_operations.archive_extensions', 
+                                                                           ['.zip', '.cbz', '.rar', '.7z']))
+    stack = [root_dir]
+    while stack:
+        current = stack.pop()
+        subdirs = []
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not (exclude_prefixes and entry.name.startswith(exclude_prefixes)):
+                                subdirs.append(entry.path)
+                        elif entry.is_file():
+                            name = entry.name
+                            dot = name.rfind('.')
+                            if dot >= 0 and name[dot:].lower() in archive_extensions:
+                                yield entry.path, entry.stat().st_size
+                    except OSError as e:
+                        logger.warning(f"扫描条目 {entry.path} 时出错: {str(e)}")
+        except OSError as e:
+            logger.error(f"扫描目录 {current} 时出错: {str(e)}")
+            continue
+        # 逆序压栈，使子目录按名称顺序出栈
+        subdirs.sort(reverse=True)
+        stack.extend(subdirs)
+
+# 可在进程内用 zipfile 校验的扩展名
+_ZIP_EXTENSIONS = ('.zip', '.cbz')
+
+def refresh_check_config():
+    """
+    从配置读取压缩包检测相关的设置，缓存为模块级变量，避免每次检测都查询配置
+    
+    修改 file_operations.archive_check_* 或 ui.verbose_ops 配置后需要调用。
+    """
+    global _CHECK_TIMEOUT, _CHECK_MIN_TIMEOUT, _CHECK_MAX_TIMEOUT, _CHECK_TIMEOUT_PER_100MB
+    global _CHECK_INPROCESS_ZIP, _CHECK_INPROCESS_MAX_BYTES, _CHECK_VERBOSE
+    _CHECK_TIMEOUT = config.get_value('file_operations.archive_check_timeout', 300)
+    _CHECK_MIN_TIMEOUT = config.get_value('file_operations.archive_check_min_timeout', 60)
+    _CHECK_MAX_TIMEOUT = config.get_value('file_operations.archive_check_max_timeout', 1800)
+    _CHECK_TIMEOUT_PER_100MB = config.get_value('file_operations.archive_check_timeout_per_100mb', 60)
+    _CHECK_INPROCESS_ZIP = config.get_value('file_operations.archive_check_inprocess_zip', True)
+    # 进程内校验无法超时中断，超过该大小的压缩包直接交给带超时的 7z 检测
+    _CHECK_INPROCESS_MAX_BYTES = config.get_value('file_operations.archive_check_inprocess_max_mb', 200) * 1024 * 1024
+    # 关闭后逐文件的开始/完好日志不再输出，损坏和错误日志不受影响
+    _CHECK_VERBOSE = config.get_value('ui.verbose_ops', True)
+
+refresh_check_config()
+
+def _test_zip_inprocess(file_path) -> bool:
+    """
+    在进程内用 zipfile 校验 zip/cbz 压缩包的所有成员 CRC
+    
+    只有全部成员校验通过才返回True。打开失败、CRC 不符、压缩方式不受支持或加密等情况都返回False，
+    由调用方再交给 7z 做最终判定（例如扩展名为 .cbz 的 rar 文件，7z 仍能正确识别）。
+    
+    Args:
+        file_path: 压缩包文件路径
+        
+    Returns:
+        bool: 是否确认完好
+    """
+    try:
+        with zipfile.ZipFile(file_path) as zf:
+            bad_member = zf.testzip()
+        if bad_member is None:
+            return True
+        logger.debug(f"[#processing]zipfile 校验 {file_path} 中的 {bad_member} 失败，改用 7z 检测")
+        return False
+    except Exception as e:
+        logger.debug(f"[#processing]zipfile 未能确认 {file_path} 完好，改用 7z 检测: {str(e)}")
+        return False
+
+def check_archive(file_path, timeout=None, file_size=None):
     """
-    使用 7z 检测压缩包是否损坏，带超时防卡死机制
+    检测压缩包是否损坏，带超时防卡死机制
+    
+    不超过 file_operations.archive_check_inprocess_max_mb 的 zip/cbz 先在进程内用 zipfile 校验
+    （可通过 file_operations.archive_check_inprocess_zip 关闭），确认完好即返回，省去启动 7z 进程的开销；
+    进程内校验没有超时，因此仅在未指定 timeout 时使用。其余文件使用带超时的 7z 检测。
     
     Args:
         file_path: 压缩包文件路径
         timeout: 超时时间（秒），如果为None则从配置获取
+        file_size: 文件大小，调用方已 stat 过时传入以免重复获取，为None时读取文件大小
         
     Returns:
         bool: 压缩包是否完好
     """
     try:
-        logger.info(f"[#processing]正在检测: {file_path}")
+        if _CHECK_VERBOSE:
+            logger.info("[#processing]正在检测: {}", file_path)
         
-        # 从配置获取超时相关设置
+        inprocess_ok = False
+        if _CHECK_INPROCESS_ZIP and timeout is None and file_path[-4:].lower() in _ZIP_EXTENSIONS:
+            if file_size is None:
+                try:
+                    file_size = os.path.getsize(file_path)
+                except OSError:
+                    pass
+            if file_size is not None and file_size <= _CHECK_INPROCESS_MAX_BYTES:
+                inprocess_ok = _test_zip_inprocess(file_path)
+        if inprocess_ok:
+            if _CHECK_VERBOSE:
+                logger.info("[#processing]检测完成: {} - 完好", file_path)
+            return True
+        
+        # 超时相关设置由 refresh_check_config 预先读取
         if timeout is None:
-            timeout = config.get_value('file_operations.archive_check_timeout', 300)
-        min_timeout = config.get_value('file_operations.archive_check_min_timeout', 60)
-        max_timeout = config.get_value('file_operations.archive_check_max_timeout', 1800)
-        timeout_per_100mb = config.get_value('file_operations.archive_check_timeout_per_100mb', 60)
+            timeout = _CHECK_TIMEOUT
         
         # 获取文件大小用于超时计算
         try:
-            file_size = os.path.getsize(file_path)
+            if file_size is None:
+                file_size = os.path.getsize(file_path)
             # 根据文件大小动态调整超时时间：每100MB增加指定秒数
-            dynamic_timeout = max(min_timeout, min(max_timeout, timeout + (file_size // (100 * 1024 * 1024)) * timeout_per_100mb))
-            logger.debug(f"[#processing]文件大小: {format_size(file_size)}, 设置超时: {dynamic_timeout}秒")
+            dynamic_timeout = max(_CHECK_MIN_TIMEOUT, min(_CHECK_MAX_TIMEOUT,
+                                  timeout + (file_size // (100 * 1024 * 1024)) * _CHECK_TIMEOUT_PER_100MB))
+            # 延迟格式化，日志级别过滤掉 DEBUG 时不计算
+            logger.opt(lazy=True).debug("[#processing]文件大小: {}, 设置超时: {}秒",
+                                        lambda: format_size(file_size), lambda: dynamic_timeout)
         except Exception:
             dynamic_timeout = timeout
             logger.warning(f"[#processing]无法获取文件大小，使用默认超时: {timeout}秒")
         
-        # 使用超时机制运行7z测试
+        # 使用超时机制运行7z测试；-bso0/-bsp0 关闭常规输出和进度，只保留写到 stderr 的错误信息
         result = subprocess.run(
-            ['7z', 't', file_path], 
-            capture_output=True, 
-            text=True, 
+            ['7z', 't', '-bso0', '-bsp0', file_path], 
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
             check=False,
             timeout=dynamic_timeout
         )
@@ -120,10 +320,10 @@ def check_archive(file_path, timeout=None):
         is_valid = result.returncode == 0
         
         if not is_valid:
-            error_output = result.stderr.strip() or result.stdout.strip()
+            error_output = result.stderr.decode(errors='replace').strip()
             logger.error(f"[#processing]文件损坏: {file_path}\n错误: {error_output}")
-        else:
-            logger.info(f"[#processing]检测完成: {file_path} - 完好")
+        elif _CHECK_VERBOSE:
+            logger.info("[#processing]检测完成: {} - 完好", file_path)
         
         return is_valid
         
@@ -143,10 +343,108 @@ def check_archive(file_path, timeout=None):
         logger.error(f"[#processing]检测文件 {file_path} 时发生未知错误: {str(e)}")
         return False
 
+# 距离上次快照追加的记录达到该数量时，加载后重新写入快照
+HISTORY_SNAPSHOT_THRESHOLD = 1000
+# 历史文件超过该大小时，加载后重写为每个路径只保留最新一条记录
+HISTORY_COMPACT_SIZE = 10 * 1024 * 1024
+# 历史文件行数超过不同路径数的该倍数（且不少于 HISTORY_SNAPSHOT_THRESHOLD 行）时，同样重写
+HISTORY_COMPACT_RATIO = 4
+
+def _json_loads(data):
+    """解析 JSON 文本或字节串，orjson 可用时优先使用"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _history_snapshot_path(history_file):
+    """检测历史快照文件路径，如 archive_check_history.snapshot.json"""
+    root, ext = os.path.splitext(history_file)
+    return f"{root}.snapshot{ext or '.json'}"
+
+def _load_history_snapshot(history_file):
+    """
+    读取检测历史快照
+    
+    Args:
+        history_file: 历史记录文件路径
+        
+    Returns:
+        tuple: (快照中的历史记录字典, 快照对应的历史文件字节偏移, 偏移之前的记录行数)，
+            快照不可用时返回 ({}, 0, 0)
+    """
+    try:
+        with open(_history_snapshot_path(history_file), 'rb') as f:
+            snapshot = _json_loads(f.read())
+        history = snapshot['history']
+        offset = int(snapshot['offset'])
+        # 历史文件被截断或替换后快照失效
+        if not isinstance(history, dict) or offset > os.path.getsize(history_file):
+            return {}, 0, 0
+        # 旧版快照没有记录行数，按每个路径一行估计
+        return history, offset, int(snapshot.get('lines', len(history)))
+    except Exception:
+        return {}, 0, 0
+
+def _save_history_snapshot(history_file, history, offset, lines):
+    """
+    写入检测历史快照（先写临时文件再原子替换），失败时忽略
+    
+    Args:
+        history_file: 历史记录文件路径
+        history: 历史记录字典
+        offset: 快照已包含的历史文件字节数
+        lines: 快照已包含的历史记录行数
+    """
+    snapshot_path = _history_snapshot_path(history_file)
+    tmp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'offset': offset, 'lines': lines, 'history': history}, f, ensure_ascii=False)
+        os.replace(tmp_path, snapshot_path)
+    except Exception as e:
+        logger.debug(f"[#processing]写入历史记录快照失败 {snapshot_path}: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+def _compact_history(history_file, history):
+    """
+    重写历史文件，每个路径只保留最新的一条记录（先写临时文件再原子替换）
+    
+    Args:
+        history_file: 历史记录文件路径
+        history: 已合并的历史记录字典
+        
+    Returns:
+        int: 重写后的文件大小，失败时返回None
+    """
+    tmp_path = history_file + '.tmp'
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.writelines(
+                json.dumps({'path': path, **entry}, ensure_ascii=False) + '\n'
+                for path, entry in history.items()
+            )
+        os.replace(tmp_path, history_file)
+        logger.info(f"[#processing]已压缩历史记录文件: {history_file} ({len(history)} 条)")
+        return os.path.getsize(history_file)
+    except Exception as e:
+        logger.warning(f"[#processing]压缩历史记录文件失败 {history_file}: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return None
+
 def load_check_history(history_file):
     """
     加载检测历史记录
     
+    先读取快照，再只解析快照之后追加的记录；新追加的记录较多时重新写入快照，
+    避免每次启动都从头逐行解析整个历史文件。文件过大或重复记录过多时去掉每个路径的旧记录；
+    配置了 scan.check_history_ttl_days 时，同时丢弃早于该天数的记录。
+    
     Args:
         history_file: 历史记录文件路径
         
@@ -156,56 +454,179 @@ def load_check_history(history_file):
     history = {}
     if os.path.exists(history_file):
         try:
-            with open(history_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        entry = json.loads(line)
-                        file_path = entry.get('path')
-                        if file_path:
-                            # Store the latest entry for each path
-                            history[file_path] = {
-                                'timestamp': entry.get('timestamp'),
-                                'valid': entry.get('valid')
-                            }
-                    except json.JSONDecodeError:
-                        logger.warning(f"[#processing]跳过无效的历史记录行: {line}")
-                        continue
+            history, offset, snapshot_lines = _load_history_snapshot(history_file)
+            replayed = 0
+            with open(history_file, 'rb') as f:
+                f.seek(offset)
+                data = f.read()
+            # 只处理完整的行，末尾未写完的一行留到下次加载
+            end = data.rfind(b'\n') + 1
+            for raw_line in data[:end].splitlines():
+                line = raw_line.strip()
+                if not line:
+                    continue
+                replayed += 1
+                try:
+                    entry = _json_loads(line)
+                    file_path = entry.get('path')
+                    if file_path:
+                        # Store the latest entry for each path
+                        history[file_path] = {
+                            'timestamp': entry.get('timestamp'),
+                            'valid': entry.get('valid'),
+                            'size': entry.get('size'),
+                            'mtime_ns': entry.get('mtime_ns')
+                        }
+                except (ValueError, AttributeError):
+                    logger.warning(f"[#processing]跳过无效的历史记录行: {line.decode('utf-8', errors='replace')}")
+                    continue
+            total_lines = snapshot_lines + replayed
+            
+            expired = 0
+            ttl_days = config.get_value('scan.check_history_ttl_days', None)
+            if ttl_days:
+                # 时间戳均为 datetime.isoformat() 格式，可直接按字符串比较
+                cutoff = (datetime.now() - timedelta(days=ttl_days)).isoformat()
+                expired_paths = [path for path, entry in history.items()
+                                 if entry.get('timestamp') and entry['timestamp'] < cutoff]
+                for path in expired_paths:
+                    del history[path]
+                expired = len(expired_paths)
+            
+            # 只在没有未写完的行时压缩，避免丢失正在追加的记录
+            compacted_size = None
+            if end == len(data) and (
+                    expired
+                    or offset + len(data) > HISTORY_COMPACT_SIZE
+                    or (total_lines >= HISTORY_SNAPSHOT_THRESHOLD
+                        and total_lines > HISTORY_COMPACT_RATIO * len(history))):
+                compacted_size = _compact_history(history_file, history)
+            if compacted_size is not None:
+                _save_history_snapshot(history_file, history, compacted_size, len(history))
+            elif replayed >= HISTORY_SNAPSHOT_THRESHOLD:
+                _save_history_snapshot(history_file, history, offset + end, total_lines)
         except Exception as e:
              logger.error(f"[#processing]加载历史记录文件失败 {history_file}: {e}")
     return history
 
-def save_check_history(history_file, new_entry):
+def is_check_cached_valid(history, file_path):
+    """
+    判断文件是否已检测为完好且之后未被修改
+    
+    记录中带有 size/mtime_ns 时与文件当前的 stat 比较，任一不同即视为需要重新检测；
+    没有这两项的旧记录仍按路径判断。
+    
+    Args:
+        history: load_check_history 返回的历史记录字典
+        file_path: 文件路径
+        
+    Returns:
+        bool: 可以跳过检测时返回True
+    """
+    entry = history.get(file_path)
+    if not entry or entry.get('valid') is not True:
+        return False
+    size = entry.get('size')
+    mtime_ns = entry.get('mtime_ns')
+    if size is None and mtime_ns is None:
+        return True
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return False
+    return st.st_size == size and st.st_mtime_ns == mtime_ns
+
+def save_check_history(history_file, new_entry, writer=None):
     """
     追加方式保存检测记录
     
     Args:
         history_file: 历史记录文件路径
         new_entry: 新的检测记录
+        writer: 可选的 CheckHistoryWriter，提供时写入其缓冲区而不是单独打开文件
     """
     try:
         new_entry['timestamp'] = datetime.now().isoformat()
         if 'time' in new_entry: # Ensure old 'time' key is removed if present
             del new_entry['time']
+        line = json.dumps(new_entry, ensure_ascii=False) + '\n'
+        if writer is not None:
+            writer.write_line(line)
+            return
         with open(history_file, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(new_entry, ensure_ascii=False) + '\n')
+            f.write(line)
     except Exception as e:
         logger.error(f"[#processing]保存检查记录失败: {str(e)}")
 
+class CheckHistoryWriter:
+    """
+    批量追加检测记录：整个检测过程只打开一次历史文件，每累积 batch_size 条写入并 flush 一次
+    
+    写入和 flush 由锁保护，可以在检测线程中直接调用。
+    """
+    def __init__(self, history_file, batch_size=64):
+        self.history_file = history_file
+        self.batch_size = batch_size
+        self._buffer = []
+        self._file = None
+        self._lock = threading.Lock()
+    
+    def __enter__(self):
+        self._file = open(self.history_file, 'a', encoding='utf-8')
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            self.flush()
+        finally:
+            self._file.close()
+            self._file = None
+    
+    def write_line(self, line):
+        """缓存一行记录，缓冲区满时写入文件"""
+        with self._lock:
+            self._buffer.append(line)
+            if len(self._buffer) >= self.batch_size:
+                self._flush_locked()
+    
+    def flush(self):
+        """将缓冲区中的记录写入文件"""
+        with self._lock:
+            self._flush_locked()
+    
+    def _flush_locked(self):
+        if self._buffer:
+            self._file.writelines(self._buffer)
+            self._file.flush()
+            self._buffer.clear()
+
+@dataclass(slots=True, eq=False)
 class ArchiveOperation:
     """
     表示一个压缩包操作的类
+    
+    使用 __slots__ 存放属性，大批量操作时每个实例不再携带 __dict__；
+    eq=False 保持按对象身份比较和哈希，与普通类一致。
     """
-    def __init__(self, source_path, target_path, operation_type="copy"):
-        self.source_path = source_path
-        self.target_path = target_path
-        self.operation_type = operation_type  # "copy" 或 "move"
-        self.source_info = None
-        self.target_info = None
-        self.is_safe = None
-        self.reason = None
-        self.status = "pending"  # pending, success, skipped, error
-        self.error_message = None
-        self.backup_path = None
+    source_path: str
+    target_path: str
+    operation_type: str = "copy"  # "copy" 或 "move"
+    source_info: Optional[Dict] = None
+    target_info: Optional[Dict] = None
+    is_safe: Optional[bool] = None
+    reason: Optional[str] = None
+    status: str = "pending"  # pending, success, skipped, error
+    error_message: Optional[str] = None
+    backup_path: Optional[str] = None
+    
+    def analyze(self) -> "ArchiveOperation":
+        """
+        分析覆盖目标文件是否安全，填充 is_safe、reason、source_info、target_info
+        
+        Returns:
+            ArchiveOperation: 自身，便于在 executor.map 中使用
+        """
+        self.is_safe, self.reason, self.source_info, self.target_info = is_safe_to_overwrite(
+            self.source_path, self.target_path
+        )
+        return self
@@ -2,7 +2,9 @@
 UI 辅助模块 - 提供Rich UI界面的渲染功能
 """
 import os
-from typing import Dict, List, Tuple, Optional, Any
+import threading
+import concurrent.futures
+from typing import Dict, List, Tuple, Optional, Any, Callable
 
 from rich.console import Console
 from rich.panel import Panel
@@ -13,12 +15,117 @@ from rich.progress import Progress
 from rich.style import Style
 from rich.text import Text
 
+from .config import config
 from .scan import ArchiveOperation
 from .operation import format_size
 
 # 创建一个全局控制台实例
 console = Console()
 
+class ProgressReporter:
+    """
+    在后台线程中按固定间隔把完成计数同步到 rich 进度条
+
+    逐项处理时只需调用 advance() 累加计数，不再每项都调用 progress.update，
+    进度条的更新频率与处理速度无关。advance() 只应在单个线程中调用。
+    """
+    def __init__(self, progress: Progress, task, interval: float = 0.2,
+                 describe: Optional[Callable[[int, Any], str]] = None):
+        """
+        初始化进度同步器
+
+        Args:
+            progress: rich 进度条
+            task: 进度条任务ID
+            interval: 同步间隔（秒）
+            describe: 可选，根据 (完成数, 最近完成的项) 生成任务描述的函数
+        """
+        self.progress = progress
+        self.task = task
+        self.interval = interval
+        self.describe = describe
+        self.completed = 0
+        self.last_item = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stop.set()
+        self._thread.join()
+        self._sync()
+
+    def advance(self, item=None):
+        """记录完成一项"""
+        self.completed += 1
+        self.last_item = item
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sync()
+
+    def _sync(self):
+        completed, item = self.completed, self.last_item
+        if self.describe is not None and item is not None:
+            self.progress.update(self.task, completed=completed, description=self.describe(completed, item))
+        else:
+            self.progress.update(self.task, completed=completed)
+
+def _archive_count_text(dir_info: Dict) -> str:
+    """
+    格式化目录的压缩包数量，按深度限制扫描、统计不完整的目录后面加 "+"
+    
+    Args:
+        dir_info: 目录信息字典
+        
+    Returns:
+        str: 压缩包数量文本
+    """
+    count = dir_info['archive_count']
+    return f"{count}+" if dir_info.get("truncated") else str(count)
+
+def _directory_label(dir_info: Dict, style: str) -> str:
+    """
+    生成目录节点的显示文本
+    
+    Args:
+        dir_info: 目录信息字典
+        style: 目录名使用的样式
+        
+    Returns:
+        str: 节点文本
+    """
+    return (f"[{style}]{dir_info['name']}[/] ([green]{_archive_count_text(dir_info)}[/] 压缩包, "
+            f"[yellow]{format_size(dir_info['total_size'])}[/])")
+
+def _add_tree_children(parent: Tree, dir_info: Dict, level: int, show_files: bool, max_depth: int):
+    """
+    把目录的子目录（及可选的文件）添加到树节点下，每个目录只访问一次
+    
+    Args:
+        parent: 要添加到的树节点
+        dir_info: 目录信息字典
+        level: dir_info 所在的级别
+        show_files: 是否显示文件
+        max_depth: 最大显示深度
+    """
+    # subdirs 在扫描时已按名称排序
+    for subdir in dir_info["subdirs"]:
+        if level + 1 < max_depth:
+            child_node = parent.add(_directory_label(subdir, "bold cyan"))
+            _add_tree_children(child_node, subdir, level + 1, show_files, max_depth)
+        elif subdir["subdirs"] or subdir["file_count"]:
+            # 超出显示深度的目录只显示一行摘要
+            parent.add(f"[dim]... (包含 {len(subdir['subdirs'])} 个子目录, {subdir['file_count']} 个文件)[/]")
+    
+    # 根目录下的文件不显示，与子目录的摘要行保持一致
+    if show_files and level > 0:
+        for file in dir_info["files"]:
+            parent.add(f"[dim]{file['name']} ({format_size(file['size'])})[/]")
+
 def display_directory_tree(dir_info, level=0, show_files=False, max_depth=2):
     """
     在控制台显示目录树结构
@@ -29,46 +136,9 @@ def display_directory_tree(dir_info, level=0, show_files=False, max_depth=2):
         show_files: 是否显示文件
         max_depth: 最大显示深度
     """
-    if level == 0:
-        tree = Tree(
-            f"[bold blue]{dir_info['name']}[/] ([green]{dir_info['archive_count']}[/] 压缩包, [yellow]{format_size(dir_info['total_size'])}[/])"
-        )
-        parent = tree
-    else:
-        if level >= max_depth:
-            if dir_info["subdirs"] or dir_info["files"]:
-                return f"[dim]... (包含 {len(dir_info['subdirs'])} 个子目录, {len(dir_info['files'])} 个文件)[/]"
-            return None
-        
-        node_text = f"[bold cyan]{dir_info['name']}[/] ([green]{dir_info['archive_count']}[/] 压缩包, [yellow]{format_size(dir_info['total_size'])}[/])"
-        return node_text
-
-    # 递归处理子目录
-    for subdir in sorted(dir_info["subdirs"], key=lambda x: x["name"]):
-        child_text = display_directory_tree(subdir, level + 1, show_files, max_depth)
-        if child_text:
-            if level + 1 >= max_depth:
-                parent.add(child_text)
-            else:
-                child_node = parent.add(child_text)
-                # 递归添加子节点
-                for sub_subdir in sorted(subdir["subdirs"], key=lambda x: x["name"]):
-                    sub_child_text = display_directory_tree(sub_subdir, level + 2, show_files, max_depth)
-                    if sub_child_text:
-                        child_node.add(sub_child_text)
-                
-                # 如果需要显示文件
-                if show_files:
-                    for file in subdir["files"]:
-                        file_text = f"[dim]{file['name']} ({format_size(file['size'])})[/]"
-                        child_node.add(file_text)
-
-    # 如果是顶层，直接打印树
-    if level == 0:
-        console.print(tree)
-        return None
-    
-    return None
+    tree = Tree(_directory_label(dir_info, "bold blue"))
+    _add_tree_children(tree, dir_info, level, show_files, max_depth)
+    console.print(tree)
 
 def generate_operations_preview(operations: List[ArchiveOperation]) -> Table:
     """
@@ -92,10 +162,15 @@ def generate_operations_preview(operations: List[ArchiveOperation]) -> Table:
     table.add_column("目标文件数", style="magenta")
     table.add_column("安全性", style="bold")
     
+    # 尚未分析的操作先并发分析（以 stat 和读取压缩包目录为主），结果保存在操作对象上，重复预览不会再次分析
+    pending = [op for op in operations if op.source_info is None]
+    if pending:
+        analyze_workers = max(1, config.get_value('processing.analyze_workers', min(32, (os.cpu_count() or 1) * 4)))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(analyze_workers, len(pending))) as executor:
+            for _ in executor.map(ArchiveOperation.analyze, pending):
+                pass
+    
     for i, op in enumerate(operations, 1):
-        if not op.source_info:
-            op.analyze()
-        
         operation_type = "移动" if op.operation_type == "move" else "复制"
         source_path = os.path.basename(op.source_path)
         target_path = os.path.basename(op.target_path)
@@ -137,37 +212,26 @@ def select_subdirectory(dir_structure: Dict, prompt_text="请选择要处理的
     console.print("\n[bold]目录结构：[/]")
     display_directory_tree(dir_structure)
     
-    # 创建选择列表
-    choices = []
-    choice_map = {}
-    
-    # 添加当前目录作为选择
-    current_dir_text = f"{dir_structure['name']} (当前目录, {dir_structure['archive_count']} 个压缩包)"
-    choices.append(current_dir_text)
-    choice_map[current_dir_text] = dir_structure
-    
-    # 添加一级子目录作为选择
-    for i, subdir in enumerate(sorted(dir_structure["subdirs"], key=lambda x: x["name"]), 1):
-        choice_text = f"{subdir['name']} ({subdir['archive_count']} 个压缩包, {format_size(subdir['total_size'])})"
-        choices.append(choice_text)
-        choice_map[choice_text] = subdir
+    # 可选项：当前目录 + 一级子目录（subdirs 在扫描时已排序），直接按编号索引
+    options = [dir_structure] + dir_structure["subdirs"]
     
     # 如果没有选择项，返回当前目录
-    if len(choices) <= 1:
+    if len(options) <= 1:
         console.print("[yellow]当前目录下没有子目录，将处理整个目录。[/]")
         return dir_structure
     
-    # 让用户选择
+    # 让用户选择；显示文本只用于打印
     console.print(f"\n[bold]{prompt_text}[/] (输入编号或按Enter处理整个目录):")
-    for i, choice in enumerate(choices):
-        console.print(f"  [cyan]{i}[/]: {choice}")
+    console.print(f"  [cyan]0[/]: {dir_structure['name']} (当前目录, {_archive_count_text(dir_structure)} 个压缩包)")
+    for i, subdir in enumerate(dir_structure["subdirs"], 1):
+        console.print(f"  [cyan]{i}[/]: {subdir['name']} ({_archive_count_text(subdir)} 个压缩包, {format_size(subdir['total_size'])})")
     
     choice_input = Prompt.ask("请输入选择", default="0")
     
     try:
         choice_idx = int(choice_input)
-        if 0 <= choice_idx < len(choices):
-            selected = choice_map[choices[choice_idx]]
+        if 0 <= choice_idx < len(options):
+            selected = options[choice_idx]
             console.print(f"[green]已选择：[/]{selected['name']}")
             return selected
         else:
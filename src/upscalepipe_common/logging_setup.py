@@ -0,0 +1,88 @@
+"""
+日志配置模块 - 为各命令行工具提供统一的 Loguru 初始化
+"""
+import os
+import sys
+from pathlib import Path
+from datetime import datetime
+from loguru import logger
+
+# 仓库根目录，模块加载时解析一次
+_PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# 当前生效的日志配置：参数键、返回结果，以及本模块注册的处理器ID
+_configured_key = None
+_configured_result = None
+_sink_ids = []
+
+def setup_logger(app_name="app", project_root=None, console_output=True):
+    """配置 Loguru 日志系统
+    
+    Args:
+        app_name: 应用名称，用于日志目录
+        project_root: 项目根目录，默认为仓库根目录
+        console_output: 是否输出到控制台，默认为True
+        
+    Returns:
+        tuple: (logger, config_info)
+            - logger: 配置好的 logger 实例
+            - config_info: 包含日志配置信息的字典
+    
+    相同参数（无论按位置还是关键字传入）的重复调用直接返回已有配置，不会重复注册处理器；
+    参数不同时先移除本函数之前注册的处理器再重新配置。
+    """
+    global _configured_key, _configured_result
+    
+    # 获取项目根目录
+    if project_root is None:
+        project_root = _PROJECT_ROOT
+    
+    key = (app_name, str(project_root), bool(console_output))
+    if key == _configured_key:
+        return _configured_result
+    
+    if _configured_key is None:
+        # 首次配置时清除默认处理器
+        logger.remove()
+    else:
+        # 只移除本函数注册过的处理器，其他模块添加的处理器保持不变
+        for sink_id in _sink_ids:
+            logger.remove(sink_id)
+        _sink_ids.clear()
+    
+    # 有条件地添加控制台处理器（简洁版格式）
+    if console_output:
+        _sink_ids.append(logger.add(
+            sys.stdout,
+            level="INFO",
+            format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <blue>{elapsed}</blue> | <level>{level.icon} {level: <8}</level> | <cyan>{name}:{function}:{line}</cyan> - <level>{message}</level>"
+        ))
+    
+    # 使用 datetime 构建日志路径
+    date_str, hour_str, minute_str = datetime.now().strftime("%Y-%m-%d/%H/%M%S").split("/")
+    
+    # 构建日志目录和文件路径
+    log_dir = os.path.join(project_root, "logs", app_name, date_str, hour_str)
+    os.makedirs(log_dir, exist_ok=True)
+    log_file = os.path.join(log_dir, f"{minute_str}.log")
+    
+    # 添加文件处理器
+    _sink_ids.append(logger.add(
+        log_file,
+        level="DEBUG",
+        rotation="10 MB",
+        retention="30 days",
+        compression="zip",
+        encoding="utf-8",
+        format="{time:YYYY-MM-DD HH:mm:ss} | {elapsed} | {level.icon} {level: <8} | {name}:{function}:{line} - {message}",
+    ))
+    
+    # 创建配置信息字典
+    config_info = {
+        'log_file': log_file,
+    }
+    
+    logger.info(f"日志系统已初始化，应用名称: {app_name}")
+    _configured_key = key
+    _configured_result = (logger, config_info)
+    return _configured_result